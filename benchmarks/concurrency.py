@@ -0,0 +1,125 @@
+# ==================== benchmarks/concurrency.py ====================
+
+# Letture e scritture al secondo con N sessioni simultanee sullo stesso file
+# SQLite, con journal delete/synchronous full e con WAL/normal.
+# Uso: python -m benchmarks.concurrency [--sessions 1,4,8] [--seconds 3]
+#
+# Ogni prova gira in un processo separato configurato con le stesse variabili
+# d'ambiente dell'applicazione (SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, vedi
+# .env.example), così i PRAGMA sono applicati dal pool come in produzione.
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Modalità confrontate: (nome, variabili d'ambiente)
+MODES = (
+    ('delete/full', {'SQLITE_JOURNAL_MODE': 'delete', 'SQLITE_SYNCHRONOUS': 'full'}),
+    ('wal/normal', {'SQLITE_JOURNAL_MODE': 'wal', 'SQLITE_SYNCHRONOUS': 'normal'}),
+)
+
+# Partite salvate prima della prova
+SEED_GAMES = 5000
+
+ERRORS = [{
+    'word_german': f"Wort{i}", 'word_italian': f"parola{i}",
+    'user_answer': 'x', 'correct_answer': f"Wort{i}", 'penalty': 1.0,
+} for i in range(5)]
+
+
+def run(sessions, seconds):
+    """
+    Una prova nel processo corrente: N sessioni che leggono e N che scrivono,
+    ognuna nel suo thread e quindi con la sua connessione del pool
+    
+    Returns:
+        dict con reads, writes e locked (operazioni fallite per lock)
+    """
+    from src.database import DatabaseManager
+    
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    db.save_games([{
+        'game_type': 'Nomi', 'mode': 'Traduzione', 'total_questions': 10,
+        'correct_answers': 5, 'errors': ERRORS,
+    }] * SEED_GAMES)
+    
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    counts_lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    
+    def session(operation, key):
+        done = locked = 0
+        while time.monotonic() < deadline:
+            try:
+                operation()
+                done += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        with counts_lock:
+            counts[key] += done
+            counts['locked'] += locked
+    
+    def read():
+        db.get_game_history_page(page_size=20)
+        db.get_overall_stats()
+    
+    def write():
+        db.save_game('Nomi', 'Traduzione', 10, 5, ERRORS)
+    
+    threads = [threading.Thread(target=session, args=(read, 'reads')) for _ in range(sessions)]
+    threads += [threading.Thread(target=session, args=(write, 'writes')) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    with db.pool.connection() as conn:
+        counts['journal_mode'] = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    return counts
+
+
+def run_in_subprocess(sessions, seconds, environment):
+    """Esegue run() in un processo con le variabili d'ambiente indicate"""
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.concurrency',
+         '--run', str(sessions), '--seconds', str(seconds)],
+        env=dict(os.environ, **environment),
+        capture_output=True, text=True, check=True,
+    )
+    # L'ultima riga è il risultato, le precedenti i messaggi di avvio del database
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Letture e scritture al secondo con N sessioni simultanee")
+    parser.add_argument('--sessions', default='1,4,8',
+                        help="numeri di sessioni da provare, separati da virgole")
+    parser.add_argument('--seconds', type=float, default=3.0,
+                        help="durata di ogni prova")
+    parser.add_argument('--run', type=int, metavar='N',
+                        help=argparse.SUPPRESS)  # prova singola, usata dai processi figli
+    args = parser.parse_args()
+    
+    if args.run is not None:
+        print(json.dumps(run(args.run, args.seconds)))
+        return
+    
+    print(f"⏱️  Letture (pagina di storico + totali) e scritture (partita con 5 errori) "
+          f"al secondo, {args.seconds:g} s per prova, {SEED_GAMES} partite già salvate")
+    print(f"   {'modalità':12s} {'N':>3s} {'letture/s':>10s} {'scritture/s':>12s} {'bloccate':>9s}")
+    for sessions in (int(value) for value in args.sessions.split(',')):
+        for name, environment in MODES:
+            counts = run_in_subprocess(sessions, args.seconds, environment)
+            assert counts['journal_mode'] == environment['SQLITE_JOURNAL_MODE'], counts
+            print(f"   {name:12s} {sessions:3d} {counts['reads'] / args.seconds:10.0f} "
+                  f"{counts['writes'] / args.seconds:12.0f} {counts['locked']:9d}")
+
+
+if __name__ == '__main__':
+    main()
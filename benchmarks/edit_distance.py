@@ -0,0 +1,84 @@
+# ==================== benchmarks/edit_distance.py ====================
+
+# Distanza di modifica su tutte le coppie del vocabolario e ricerca delle
+# parole vicine: indice delle cancellazioni contro scansione lineare.
+# Uso: python -m benchmarks.edit_distance
+
+import random
+import time
+from src.data_loader import DataLoader
+from src.edit_distance import DeletionIndex, bounded_levenshtein, levenshtein
+from src.normalization import normalize_german_text
+
+
+def vocabulary_forms():
+    """Forme normalizzate distinte di tutte le parole del vocabolario"""
+    loader = DataLoader()
+    return sorted({
+        normalize_german_text(word.german)
+        for category in ('Nomi', 'Verbi', 'Aggettivi')
+        for word in loader.load_words(category)
+    })
+
+
+def main():
+    words = vocabulary_forms()
+    pairs = len(words) * (len(words) - 1) // 2
+    
+    # Correttezza su un campione, contro la matrice classica
+    random.seed(0)
+    sample = [(random.choice(words), random.choice(words)) for _ in range(20000)]
+    for a, b in sample:
+        expected = levenshtein(a, b)
+        assert bounded_levenshtein(a, b, len(a) + len(b)) == expected, (a, b)
+        for k in range(3):
+            assert bounded_levenshtein(a, b, k) == (expected if expected <= k else None), (a, b, k)
+    
+    start = time.perf_counter()
+    for a, b in sample:
+        levenshtein(a, b)
+    classic = (time.perf_counter() - start) / len(sample)
+    
+    print(f"📏 {len(words)} parole, {pairs} coppie")
+    print(f"   matrice classica (campione)      {classic * 1e6:7.2f} µs/coppia")
+    
+    for max_distance in (1, 2, 100):
+        start = time.perf_counter()
+        within = 0
+        for i, a in enumerate(words):
+            for b in words[i + 1:]:
+                if bounded_levenshtein(a, b, max_distance) is not None:
+                    within += 1
+        seconds = time.perf_counter() - start
+        print(f"   bit-parallela, soglia {max_distance:<3d}        "
+              f"{seconds / pairs * 1e6:7.2f} µs/coppia  ({within} coppie entro la soglia)")
+    
+    # Ricerca dei vicini: indice delle cancellazioni contro scansione lineare
+    start = time.perf_counter()
+    index = DeletionIndex(((word, word) for word in words), max_distance=2)
+    build = time.perf_counter() - start
+    queries = [word[:-1] + 'x' for word in random.sample(words, 500)]
+    
+    print(f"\n🔎 Indice su {len(index.keys)} parole ({len(index.buckets)} cancellazioni, "
+          f"costruito in {build * 1e3:.0f} ms), {len(queries)} ricerche")
+    for max_distance in (0, 1, 2):
+        start = time.perf_counter()
+        found_index = [index.search(query, max_distance) for query in queries]
+        index_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        found_scan = [
+            sorted((distance, word) for word in words
+                   for distance in [bounded_levenshtein(word, query, max_distance)]
+                   if distance is not None)
+            for query in queries
+        ]
+        scan_seconds = time.perf_counter() - start
+        
+        assert [[(d, k) for d, k, _ in found] for found in found_index] == found_scan
+        print(f"   raggio {max_distance}: indice {index_seconds / len(queries) * 1e6:7.1f} µs, "
+              f"scansione {scan_seconds / len(queries) * 1e6:7.1f} µs per ricerca")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# ==================== benchmarks/normalization.py ====================
+
+# Micro-benchmark della normalizzazione sul vocabolario completo.
+# Uso: python -m benchmarks.normalization
+
+import timeit
+from src.data_loader import DataLoader
+from src.normalization import (GERMAN_NORMALIZER, GERMAN_RULES, ITALIAN_NORMALIZER, Normalizer,
+                               normalize_german_text)
+
+
+def legacy_normalize(text):
+    """Implementazione precedente, per confronto"""
+    if not text:
+        return text
+    normalized = text.lower().strip()
+    normalized = normalized.replace('ae', 'ä')
+    normalized = normalized.replace('oe', 'ö')
+    normalized = normalized.replace('ue', 'ü')
+    return normalized.replace('ss', 'ß')
+
+
+def vocabulary_texts():
+    """Ogni parola in tre forme: come nel CSV, minuscola e scritta senza umlaut/ß"""
+    loader = DataLoader()
+    texts = []
+    for category in ('Nomi', 'Verbi', 'Aggettivi'):
+        for word in loader.load_words(category):
+            texts.append(word.german)
+            texts.append(word.german.lower())
+            texts.append(word.german.replace('ä', 'ae').replace('ö', 'oe')
+                         .replace('ü', 'ue').replace('ß', 'ss'))
+    return texts
+
+
+def main(rounds=7):
+    texts = vocabulary_texts()
+    candidates = [
+        ('precedente (4 replace)', legacy_normalize),
+        ('normalize_german_text', normalize_german_text),
+        (f"Normalizer ({GERMAN_NORMALIZER.strategy})", GERMAN_NORMALIZER.normalize),
+        ('Normalizer (regex)', Normalizer(GERMAN_RULES, strategy='regex').normalize),
+        ('Normalizer italiano (accenti)', ITALIAN_NORMALIZER.normalize),
+    ]
+    
+    expected = [legacy_normalize(text) for text in texts]
+    for name, normalize in candidates[1:4]:
+        assert [normalize(text) for text in texts] == expected, name
+    
+    # Turni alternati, minimo di ciascuno: riduce il rumore di una macchina carica
+    timings = {name: [] for name, _ in candidates}
+    for _ in range(rounds):
+        for name, normalize in candidates:
+            seconds = timeit.timeit(lambda: [normalize(text) for text in texts], number=10)
+            timings[name].append(seconds / 10 / len(texts) * 1e9)
+    
+    print(f"📏 {len(texts)} testi dal vocabolario")
+    for name, _ in candidates:
+        print(f"   {name:32s} {min(timings[name]):7.0f} ns/testo")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# ==================== benchmarks/save_latency.py ====================
+
+# Latenza del salvataggio di una partita al variare del numero di errori:
+# errori in blocco (DatabaseManager.save_game) contro un INSERT e un
+# aggiornamento dell'aggregato per ogni errore, come prima.
+# Uso: python -m benchmarks.save_latency [--runs 200] [--postgres]
+#
+# Senza --postgres usa un file SQLite temporaneo. Con --postgres usa
+# DATABASE_URL, che deve puntare a un database di prova (es. un PostgreSQL
+# locale in Docker): le partite misurate vengono salvate davvero.
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from src.database import DATABASE_URL, USE_POSTGRES, DatabaseManager, split_game_type, to_epoch
+
+# Numeri di errori per partita misurati
+ERROR_COUNTS = (0, 1, 10, 50, 100)
+
+
+def make_errors(count):
+    """Errori sintetici, tutti su parole diverse"""
+    return [{
+        'word_german': f"Wort{i}", 'word_italian': f"parola{i}",
+        'user_answer': 'x', 'correct_answer': f"Wort{i}", 'penalty': 1.0,
+    } for i in range(count)]
+
+
+def save_row_by_row(db, game_type, mode, total_questions, correct_answers, errors):
+    """Salvataggio precedente: un INSERT e un aggiornamento dell'aggregato per errore"""
+    success_rate = correct_answers / total_questions * 100
+    category, session_kind = split_game_type(game_type)
+    game = (game_type, mode, total_questions, correct_answers, success_rate,
+            category, session_kind, str(uuid.uuid4()))
+    
+    with db.pool.connection() as conn:
+        cursor = conn.cursor()
+        
+        if db.use_postgres:
+            cursor.execute("""
+                INSERT INTO games (timestamp, game_type, mode, total_questions,
+                                 correct_answers, success_rate, category, session_kind, uuid)
+                VALUES (NOW(), %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING id, timestamp
+            """, game)
+            game_id, timestamp = cursor.fetchone()
+            
+            for error in errors:
+                cursor.execute("""
+                    INSERT INTO errors (game_id, word_german, word_italian,
+                                      user_answer, correct_answer, penalty)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, (game_id, error['word_german'], error['word_italian'],
+                      error['user_answer'], error['correct_answer'], error['penalty']))
+                cursor.execute("""
+                    INSERT INTO word_error_stats AS s (word_german, word_italian, category,
+                                                       error_count, penalty_sum, last_seen)
+                    VALUES (%s, %s, %s, 1, %s, %s)
+                    ON CONFLICT (word_german, word_italian, category) DO UPDATE SET
+                        error_count = s.error_count + EXCLUDED.error_count,
+                        penalty_sum = s.penalty_sum + EXCLUDED.penalty_sum,
+                        last_seen = GREATEST(s.last_seen, EXCLUDED.last_seen)
+                """, (error['word_german'], error['word_italian'], category,
+                      error['penalty'], timestamp))
+        
+        else:
+            timestamp = to_epoch(datetime.now())
+            cursor.execute("""
+                INSERT INTO games (timestamp, game_type, mode, total_questions,
+                                 correct_answers, success_rate, category, session_kind, uuid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (timestamp,) + game)
+            game_id = cursor.lastrowid
+            
+            for error in errors:
+                cursor.execute("""
+                    INSERT INTO errors (game_id, word_german, word_italian,
+                                      user_answer, correct_answer, penalty)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (game_id, error['word_german'], error['word_italian'],
+                      error['user_answer'], error['correct_answer'], error['penalty']))
+                cursor.execute("""
+                    INSERT INTO word_error_stats (word_german, word_italian, category,
+                                                  error_count, penalty_sum, last_seen)
+                    VALUES (?, ?, ?, 1, ?, ?)
+                    ON CONFLICT (word_german, word_italian, category) DO UPDATE SET
+                        error_count = error_count + excluded.error_count,
+                        penalty_sum = penalty_sum + excluded.penalty_sum,
+                        last_seen = MAX(last_seen, excluded.last_seen)
+                """, (error['word_german'], error['word_italian'], category,
+                      error['penalty'], timestamp))
+        
+        conn.commit()
+
+
+def median_ms(save, db, errors, runs):
+    """Mediana in millisecondi di runs salvataggi, commit compreso"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        save(db, 'Nomi', 'Traduzione', 100, 100 - len(errors), errors)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def batched(db, game_type, mode, total_questions, correct_answers, errors):
+    """Salvataggio attuale: errori e aggregato in blocco"""
+    db.save_game(game_type, mode, total_questions, correct_answers, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latenza del salvataggio al variare degli errori")
+    parser.add_argument('--runs', type=int, default=200,
+                        help="salvataggi misurati per ogni numero di errori")
+    parser.add_argument('--postgres', action='store_true',
+                        help="misura anche DATABASE_URL (solo un database di prova)")
+    args = parser.parse_args()
+    
+    backends = [('SQLite', DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), 'bench.db')))]
+    if args.postgres:
+        if not USE_POSTGRES:
+            parser.error("--postgres richiede DATABASE_URL con un URL PostgreSQL")
+        backends.append(('PostgreSQL', DatabaseManager(database_url=DATABASE_URL)))
+    
+    for name, db in backends:
+        print(f"⏱️  {name}: mediana su {args.runs} salvataggi")
+        print("   errori   in blocco   uno per errore")
+        for count in ERROR_COUNTS:
+            errors = make_errors(count)
+            print(f"   {count:6d}   {median_ms(batched, db, errors, args.runs):6.2f} ms"
+                  f"   {median_ms(save_row_by_row, db, errors, args.runs):9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
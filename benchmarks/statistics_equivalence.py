@@ -0,0 +1,158 @@
+# ==================== benchmarks/statistics_equivalence.py ====================
+
+# Le aggregazioni SQL della dashboard devono dare gli stessi risultati del
+# calcolo in Python sulle singole partite, usato prima di spostarle nel
+# database. Confronto e tempi su uno storico sintetico con giorni e intere
+# settimane senza partite.
+# Uso: python -m benchmarks.statistics_equivalence [--games 1000000] [--years 4]
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from src.database import DatabaseManager, split_game_type, to_epoch
+from src.statistics import DashboardSnapshot, compute_streaks
+
+GAME_TYPES = ('Nomi', 'Verbi', 'Aggettivi', 'Nomi (Ripasso)', 'Verbi (Studio Approfondito)')
+
+
+def python_stats(db, taken_at, weeks=4):
+    """Calcolo precedente: tutte le partite lette e aggregate in Python"""
+    games = list(db.iter_game_history())
+    
+    total_games = len(games)
+    total_questions = sum(game[4] for game in games)
+    total_correct = sum(game[5] for game in games)
+    avg_success = sum(game[6] for game in games) / total_games
+    best_game = max(games, key=lambda x: x[6])
+    
+    # Settimane (dal lunedì) con almeno una partita, le più recenti
+    weekly_stats = defaultdict(lambda: {'games': 0, 'total_success': 0})
+    for game in games:
+        week_start = game[1] - timedelta(days=game[1].weekday())
+        week_key = week_start.strftime("%Y-%m-%d")
+        weekly_stats[week_key]['games'] += 1
+        weekly_stats[week_key]['total_success'] += game[6]
+    weekly = [(week, stats['games'], stats['total_success'] / stats['games'])
+              for week, stats in sorted(weekly_stats.items(), reverse=True)[:weeks]]
+    
+    dates = sorted({game[1].date() for game in games}, reverse=True)
+    week_ago = taken_at - timedelta(days=7)
+    
+    return {
+        'overall': (total_games, total_questions, total_correct, avg_success),
+        'best_game': (best_game[6], best_game[1]),
+        'weekly': weekly,
+        'play_dates': dates,
+        'streaks': compute_streaks(dates, today=taken_at.date()),
+        'recent_count': sum(1 for game in games if game[1] > week_ago),
+    }
+
+
+def sql_stats(db, weeks=4):
+    """
+    Calcolo attuale: solo i risultati aggregati escono dal database
+    
+    Returns:
+        tuple (istante della lettura, risultati con le chiavi di python_stats)
+    """
+    snapshot = DashboardSnapshot(db, weeks=weeks)
+    overall = snapshot.overall
+    return snapshot.taken_at, {
+        'overall': (overall['games'], overall['total_questions'],
+                    overall['total_correct'], overall['avg_success']),
+        'best_game': (snapshot.best_game[6], snapshot.best_game[1]),
+        'weekly': [tuple(week) for week in snapshot.weekly],
+        'play_dates': snapshot.play_dates,
+        'streaks': (snapshot.current_streak, snapshot.longest_streak),
+        'recent_count': snapshot.games_last_week,
+    }
+
+
+def same(a, b):
+    """Uguaglianza, con tolleranza sulle medie in virgola mobile"""
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def compare(db):
+    """
+    Confronta i due calcoli sullo stesso istante di riferimento
+    
+    Returns:
+        tuple (campi diversi, secondi Python, secondi SQL)
+    """
+    start = time.perf_counter()
+    taken_at, actual = sql_stats(db)
+    sql_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    expected = python_stats(db, taken_at)
+    python_seconds = time.perf_counter() - start
+    
+    mismatches = [name for name in expected if not same(expected[name], actual[name])]
+    return mismatches, python_seconds, sql_seconds
+
+
+def fill_history(db, games, years, seed=0):
+    """
+    Storico sintetico fino a oggi, inserito direttamente nel SQLite: circa
+    il 5% delle settimane e il 5% dei giorni restanti restano senza partite
+    
+    Returns:
+        numero di giorni senza partite
+    """
+    random.seed(seed)
+    now = datetime.now().replace(microsecond=0)
+    days = 365 * years
+    skipped_weeks = {week for week in range(days // 7 + 1) if random.random() < 0.05}
+    skipped = {day for day in range(days)
+               if day // 7 in skipped_weeks or random.random() < 0.05}
+    played = [day for day in range(days) if day not in skipped]
+    
+    rows = []
+    for i in range(games):
+        moment = now - timedelta(days=random.choice(played), seconds=random.randrange(86400))
+        game_type = random.choice(GAME_TYPES)
+        total = random.choice((10, 20, 30))
+        correct = random.randint(0, total)
+        rows.append((to_epoch(moment), game_type, 'Traduzione', total, correct,
+                     correct / total * 100, *split_game_type(game_type), f"bench-{i}"))
+    
+    with db.pool.connection() as conn:
+        conn.executemany("""
+            INSERT INTO games (timestamp, game_type, mode, total_questions,
+                             correct_answers, success_rate, category, session_kind, uuid)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+    return len(skipped)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confronta le statistiche SQL con il calcolo in Python")
+    parser.add_argument('--games', type=int, default=1_000_000, help="partite sintetiche")
+    parser.add_argument('--years', type=int, default=4, help="anni coperti dallo storico")
+    args = parser.parse_args()
+    
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), 'stats.db'))
+    skipped = fill_history(db, args.games, args.years)
+    mismatches, python_seconds, sql_seconds = compare(db)
+    
+    print(f"📊 {args.games} partite su {args.years} anni ({skipped} giorni senza partite)")
+    for name in ('overall', 'best_game', 'weekly', 'play_dates', 'streaks', 'recent_count'):
+        print(f"   {'❌' if name in mismatches else '✅'} {name}")
+    print(f"   Python: {python_seconds:.1f} s, SQL: {sql_seconds:.1f} s")
+    if mismatches:
+        raise SystemExit(f"❌ Risultati diversi: {', '.join(mismatches)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# ==================== benchmarks/word_memory.py ====================
+
+# Memoria delle parole del vocabolario: byte per parola e per sessione,
+# __slots__ contro gli stessi attributi in un __dict__ per istanza.
+# Uso: python -m benchmarks.word_memory
+
+import copy
+import csv
+import os
+import tracemalloc
+from src.data_loader import DataLoader
+
+
+class DictWord:
+    """Stessi attributi in un __dict__ per istanza, come prima degli __slots__"""
+
+
+def slot_names(word):
+    """Attributi dichiarati negli __slots__ della parola e delle sue basi"""
+    return [name for cls in type(word).__mro__ for name in getattr(cls, '__slots__', ())]
+
+
+def as_dict_word(word):
+    """Copia della parola con gli attributi in un __dict__"""
+    plain = DictWord()
+    for name in slot_names(word):
+        setattr(plain, name, getattr(word, name))
+    return plain
+
+
+def allocated(build):
+    """Byte allocati (e ancora vivi) da build(), più il risultato"""
+    start = tracemalloc.get_traced_memory()[0]
+    result = build()
+    return tracemalloc.get_traced_memory()[0] - start, result
+
+
+def main(questions=100):
+    # Le righe dei CSV vengono lette prima: le stringhe dei campi sono condivise
+    loader = DataLoader()
+    rows = {}
+    for filename in DataLoader.SOURCES:
+        with open(os.path.join(loader.assets_dir, filename), encoding='utf-8', newline='') as f:
+            rows[filename] = list(csv.DictReader(f))
+    
+    tracemalloc.start()
+    parsed, words = allocated(lambda: [
+        word
+        for filename, parse in DataLoader.SOURCES.items()
+        for word in getattr(DataLoader, parse)(rows[filename])
+    ])
+    
+    # Solo l'oggetto parola: attributi (stringhe e AnswerForms) condivisi in entrambi i casi
+    slotted, _ = allocated(lambda: [copy.copy(word) for word in words])
+    with_dict, dict_words = allocated(lambda: [as_dict_word(word) for word in words])
+    
+    # Una sessione: copie delle parole oppure riferimenti al vocabolario
+    session_dict, _ = allocated(lambda: [copy.copy(word) for word in dict_words[:questions]])
+    session_slotted, _ = allocated(lambda: [copy.copy(word) for word in words[:questions]])
+    session_refs, _ = allocated(lambda: list(words[:questions]))
+    tracemalloc.stop()
+    
+    count = len(words)
+    print(f"📏 {count} parole")
+    print(f"   costruzione con AnswerForms (__slots__)  {parsed / count:7.1f} B/parola")
+    print(f"   oggetto parola con __dict__              {with_dict / count:7.1f} B/parola")
+    print(f"   oggetto parola con __slots__             {slotted / count:7.1f} B/parola")
+    print(f"\n🧑 Sessione con {questions} domande")
+    print(f"   copie con __dict__                       {session_dict / 1024:7.1f} KB")
+    print(f"   copie con __slots__                      {session_slotted / 1024:7.1f} KB")
+    print(f"   riferimenti al vocabolario condiviso     {session_refs / 1024:7.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+# ==================== src/connection_pool.py ====================
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+
+def _env_int(name, default):
+    """Legge un intero da una variabile d'ambiente"""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+# Dimensioni del pool PostgreSQL
+POOL_MIN_SIZE = _env_int('DB_POOL_MIN_SIZE', 1)
+POOL_MAX_SIZE = _env_int('DB_POOL_MAX_SIZE', 10)
+
+# Una connessione inattiva da più di questi secondi viene verificata
+# con un SELECT 1 prima di essere riutilizzata (0 = verifica sempre)
+POOL_HEALTH_CHECK_INTERVAL = _env_int('DB_POOL_HEALTH_CHECK_INTERVAL', 30)
+
+
+# Valori ammessi per i PRAGMA testuali (i PRAGMA non accettano parametri)
+_SQLITE_CHOICES = {
+    'journal_mode': {'delete', 'truncate', 'persist', 'memory', 'wal', 'off'},
+    'synchronous': {'off', 'normal', 'full', 'extra'},
+}
+
+
+def _sqlite_pragmas():
+    """
+    PRAGMA da applicare a ogni connessione SQLite, letti dall'ambiente
+    
+    Una variabile vuota lascia il valore predefinito di SQLite.
+    """
+    defaults = {
+        'busy_timeout': '5000',
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': '',
+        'mmap_size': '',
+    }
+    
+    pragmas = {}
+    for name, default in defaults.items():
+        value = os.getenv(f'SQLITE_{name.upper()}', default).strip().lower()
+        if not value:
+            continue
+        if name in _SQLITE_CHOICES:
+            if value not in _SQLITE_CHOICES[name]:
+                raise ValueError(f"SQLITE_{name.upper()} non valido: {value}")
+        else:
+            value = str(int(value))
+        pragmas[name] = value
+    return pragmas
+
+
+# WAL permette letture in parallelo a una scrittura; busy_timeout (ms) fa
+# attendere invece di fallire con "database is locked"
+SQLITE_PRAGMAS = _sqlite_pragmas()
+
+
+class PostgresConnectionPool:
+    """
+    Pool di connessioni PostgreSQL condiviso tra i thread
+    
+    Basato su psycopg2.pool.ThreadedConnectionPool; quando tutte le
+    connessioni sono in uso i chiamanti attendono invece di ricevere PoolError.
+    """
+    
+    def __init__(self, dsn, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 health_check_interval=POOL_HEALTH_CHECK_INTERVAL):
+        import psycopg2
+        from psycopg2.pool import ThreadedConnectionPool
+        
+        self._errors = (psycopg2.Error,)
+        self._pool = ThreadedConnectionPool(min_size, max_size, dsn)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._last_used = {}  # id(connessione) -> istante dell'ultimo rilascio
+        self.health_check_interval = health_check_interval
+        self.min_size = min_size
+        self.max_size = max_size
+        self.closed = False
+    
+    @contextmanager
+    def connection(self):
+        """
+        Presta una connessione del pool per la durata del blocco with
+        
+        Al rilascio una transazione non confermata viene annullata, come
+        avveniva chiudendo la connessione.
+        """
+        if self.closed:
+            raise RuntimeError("Pool di connessioni chiuso")
+        
+        self._slots.acquire()
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            finally:
+                self._release(conn)
+        finally:
+            self._slots.release()
+    
+    def _checkout(self):
+        """Preleva una connessione sana dal pool"""
+        while True:
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            self._pool.putconn(conn, close=True)
+    
+    def _is_healthy(self, conn):
+        """Verifica una connessione rimasta inattiva a lungo"""
+        if conn.closed:
+            return False
+        
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            conn.rollback()
+            return True
+        except self._errors:
+            return False
+    
+    def _release(self, conn):
+        """Restituisce la connessione al pool (chiudendola se è rotta)"""
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()
+            except self._errors:
+                broken = True
+        
+        if broken:
+            self._last_used.pop(id(conn), None)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+        self._pool.putconn(conn, close=broken)
+    
+    def close(self):
+        """Chiude tutte le connessioni del pool"""
+        if not self.closed:
+            self.closed = True
+            self._pool.closeall()
+
+
+class SQLiteConnectionPool:
+    """
+    Una connessione SQLite persistente per ogni thread
+    
+    Le connessioni dei thread terminati (Streamlit usa un thread per ogni
+    esecuzione dello script) vengono chiuse alla prima occasione.
+    """
+    
+    def __init__(self, db_path, health_check_interval=POOL_HEALTH_CHECK_INTERVAL,
+                 pragmas=None):
+        self.db_path = db_path
+        self.health_check_interval = health_check_interval
+        self.pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # ident del thread -> (weakref al thread, connessione)
+        self._version_conn = None  # connessione riservata a data_version()
+        self.closed = False
+    
+    @contextmanager
+    def connection(self):
+        """
+        Presta la connessione del thread corrente per la durata del blocco with
+        
+        I blocchi annidati nello stesso thread condividono la connessione; solo
+        il rilascio più esterno annulla una transazione non confermata.
+        """
+        if self.closed:
+            raise RuntimeError("Pool di connessioni chiuso")
+        
+        conn = self._checkout()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield conn
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._release(conn)
+    
+    def _checkout(self):
+        """Restituisce la connessione del thread, aprendola o riaprendola se serve"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'depth', 0) == 0 and not self._is_healthy(conn):
+            self._discard(threading.get_ident())
+            conn = None
+        
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.last_used = time.monotonic()
+        return conn
+    
+    def _connect(self):
+        """Apre una nuova connessione per il thread corrente"""
+        # La connessione è usata solo dal thread che l'ha aperta; check_same_thread
+        # è disattivato per poterla chiudere da close() o dalla pulizia dei thread morti
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        
+        thread = threading.current_thread()
+        with self._lock:
+            self._close_dead_threads()
+            self._connections[threading.get_ident()] = (weakref.ref(thread), conn)
+        return conn
+    
+    def data_version(self):
+        """
+        PRAGMA data_version di una connessione riservata del pool
+        
+        Cambia ogni volta che un'altra connessione conferma modifiche al file,
+        anche da un altro processo. Non legge nessuna tabella: costa molto
+        meno di una query, e la connessione non partecipa mai a transazioni.
+        """
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("Pool di connessioni chiuso")
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _is_healthy(self, conn):
+        """Verifica una connessione rimasta inattiva a lungo"""
+        last_used = getattr(self._local, 'last_used', 0)
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _release(self, conn):
+        """Chiude l'eventuale transazione rimasta aperta"""
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            self._discard(threading.get_ident())
+            return
+        self._local.last_used = time.monotonic()
+    
+    def _discard(self, ident):
+        """Chiude e dimentica la connessione di un thread"""
+        with self._lock:
+            _, conn = self._connections.pop(ident, (None, None))
+        if ident == threading.get_ident():
+            self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
+    def _close_dead_threads(self):
+        """Chiude le connessioni dei thread terminati (da chiamare con _lock)"""
+        for ident, (thread_ref, conn) in list(self._connections.items()):
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                del self._connections[ident]
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+    
+    def close(self):
+        """Chiude tutte le connessioni aperte"""
+        with self._lock:
+            self.closed = True
+            connections = [conn for _, conn in self._connections.values()]
+            self._connections.clear()
+            if self._version_conn is not None:
+                connections.append(self._version_conn)
+                self._version_conn = None
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+# ==================== REGISTRO DEI POOL ====================
+
+# Un solo pool per database in tutto il processo: {destinazione: pool}
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database_url=None, db_path=None):
+    """
+    Restituisce il pool condiviso per un database, creandolo al primo utilizzo
+    
+    Args:
+        database_url: URL PostgreSQL (se indicato ha la precedenza)
+        db_path: percorso del file SQLite
+    """
+    key = ('postgres', database_url) if database_url else ('sqlite', os.path.abspath(db_path))
+    
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            if database_url:
+                pool = PostgresConnectionPool(database_url)
+            else:
+                pool = SQLiteConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """Chiude tutti i pool del processo (registrata anche con atexit)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
@@ -1,97 +1,452 @@
-
+# ==================== src/data_loader.py ====================
 
 import csv
+import hashlib
+import io
 import os
+import pickle
+import tempfile
+import threading
+from itertools import chain
+from src.edit_distance import DeletionIndex
 from src.word import Noun, Verb, Adjective
 
 
+# Snapshot binario dei tre CSV, salvato accanto ai file sorgente
+SNAPSHOT_FILENAME = 'vocabulary.snapshot'
+
+# Da incrementare ogni volta che cambia la struttura delle classi in src/word.py,
+# così gli snapshot scritti dalle versioni precedenti vengono ignorati
+SNAPSHOT_VERSION = 7
+
+# Errori di lettura di uno snapshot illeggibile, troncato o scritto da una
+# versione con classi diverse: lo snapshot viene ignorato e si rilegge il CSV
+SNAPSHOT_READ_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError)
+
+# Errori di caricamento di un CSV mancante o malformato (file, codifica,
+# colonne mancanti, valori non validi)
+VOCABULARY_ERRORS = (OSError, csv.Error, KeyError, ValueError)
+
+# Cache del vocabolario condivisa da tutte le istanze di DataLoader del processo
+# (e quindi da tutte le sessioni Streamlit): {percorso assoluto del CSV: _CacheEntry}
+_vocabulary_cache = {}
+_cache_lock = threading.Lock()
+
+
+class Vocabulary:
+    """Parole di una categoria con gli indici precalcolati al caricamento"""
+    
+    def __init__(self, words):
+        self.words = tuple(words)
+        
+        # Indice per livello di frequenza: {livello: tupla di parole}
+        buckets = {}
+        for word in self.words:
+            buckets.setdefault(word.frequency, []).append(word)
+        self.by_frequency = {level: tuple(buckets[level]) for level in sorted(buckets)}
+        self.frequency_counts = {level: len(bucket) for level, bucket in self.by_frequency.items()}
+        
+        # Indici per forma: {lemma tedesco: parole} e {significato italiano: parole}.
+        # Per l'italiano vale sia il significato completo ("persona/essere umano")
+        # sia ogni singola alternativa ("persona", "essere umano").
+        by_german = {}
+        by_italian = {}
+        for word in self.words:
+            by_german.setdefault(word.german, []).append(word)
+            for meaning in {word.italian, *(part.strip() for part in word.italian.split('/'))}:
+                if meaning:
+                    by_italian.setdefault(meaning, []).append(word)
+        self.by_german = {german: tuple(words) for german, words in by_german.items()}
+        self.by_italian = {italian: tuple(words) for italian, words in by_italian.items()}
+        
+        # Indice per forma normalizzata, per cercare le parole vicine a una
+        # risposta sbagliata: costruito alla prima ricerca, escluso dallo snapshot
+        self._form_index = None
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_form_index'] = None
+        return state
+    
+    def near(self, text, max_distance):
+        """
+        Parole la cui forma normalizzata dista al massimo max_distance da text
+        
+        Args:
+            text: forma normalizzata della risposta (come Word.forms.normalized)
+            max_distance: numero massimo di modifiche (al più 2)
+        
+        Returns:
+            list di tuple (distanza, parola), dalla più vicina
+        """
+        if self._form_index is None:
+            self._form_index = DeletionIndex(
+                ((word.forms.normalized, word) for word in self.words),
+                max_distance=2
+            )
+        return [
+            (distance, word)
+            for distance, _, words in self._form_index.search(text, max_distance)
+            for word in words
+        ]
+    
+    def words_at_level(self, level):
+        """Parole con frequenza = level (lookup diretto nel bucket)"""
+        return list(self.by_frequency.get(level, ()))
+    
+    def words_up_to_level(self, level):
+        """Parole con frequenza <= level (concatenazione dei bucket)"""
+        return list(chain.from_iterable(
+            bucket for bucket_level, bucket in self.by_frequency.items() if bucket_level <= level
+        ))
+    
+    def count_up_to_level(self, level):
+        """Numero di parole con frequenza <= level"""
+        return sum(count for bucket_level, count in self.frequency_counts.items() if bucket_level <= level)
+    
+    def find(self, german, italian=None):
+        """
+        Trova le parole corrispondenti a una coppia (tedesco, italiano) salvata nel database
+        
+        Il lemma tedesco può avere più significati (es. 'Grund'): se l'italiano
+        è indicato si preferiscono le parole con quel significato. Se il lemma
+        non è nel vocabolario si ripiega sull'indice italiano.
+        
+        Returns:
+            tupla di parole (vuota se non trovate)
+        """
+        candidates = self.by_german.get(german, ())
+        if italian is None:
+            return candidates
+        
+        if candidates:
+            matching = tuple(word for word in candidates if word.italian == italian)
+            return matching or candidates
+        
+        return self.by_italian.get(italian, ())
+
+
+class WordList(list):
+    """
+    Lista di parole restituita da DataLoader
+    
+    È una normale lista (i chiamanti la mescolano sul posto) che conserva un
+    riferimento al Vocabulary da cui proviene, così i filtri possono usarne
+    gli indici invece di scorrere tutte le parole.
+    """
+    
+    def __init__(self, vocabulary):
+        super().__init__(vocabulary.words)
+        self.vocabulary = vocabulary
+
+
+def _vocabulary_of(words):
+    """Restituisce il Vocabulary di una lista di parole, se è ancora completa"""
+    vocabulary = getattr(words, 'vocabulary', None)
+    if vocabulary is not None and len(words) == len(vocabulary.words):
+        return vocabulary
+    return None
+
+
+class _CacheEntry:
+    """Vocabolario caricato da un CSV insieme all'impronta del file sorgente"""
+    
+    __slots__ = ('signature', 'digest', 'vocabulary')
+    
+    def __init__(self, signature, digest, vocabulary):
+        self.signature = signature    # (mtime_ns, size) del file
+        self.digest = digest          # sha1 del contenuto
+        self.vocabulary = vocabulary  # Vocabulary con le parole e gli indici
+
+
+def _file_signature(filepath):
+    """Firma economica di un file: (mtime in ns, dimensione)"""
+    stat = os.stat(filepath)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """
+    Unpickler che rifiuta le classi di __main__: uno snapshot scritto da
+    "python -m" con le classi di __main__ non si caricherebbe nell'applicazione
+    
+    Usato sia all'avvio (_read_snapshot) sia dal controllo dopo la build.
+    """
+    
+    def find_class(self, module, name):
+        if module == '__main__':
+            raise pickle.UnpicklingError(f"Classe {name} registrata in __main__")
+        return super().find_class(module, name)
+
+
+def clear_vocabulary_cache():
+    """Svuota la cache del vocabolario (il prossimo caricamento rilegge i dati)"""
+    with _cache_lock:
+        _vocabulary_cache.clear()
+
+
 class DataLoader:
     """Carica i dati dai file CSV"""
     
+    # File sorgente e relativo metodo di parsing
+    SOURCES = {
+        'nomi.csv': '_parse_nouns',
+        'verbi.csv': '_parse_verbs',
+        'aggettivi.csv': '_parse_adjectives',
+    }
+    
+    # Categoria di gioco -> file sorgente
+    GAME_TYPES = {
+        'Nomi': 'nomi.csv',
+        'Verbi': 'verbi.csv',
+        'Aggettivi': 'aggettivi.csv',
+    }
+    
     def __init__(self, assets_dir='assets'):
         self.assets_dir = assets_dir
+        self.snapshot_path = os.path.join(assets_dir, SNAPSHOT_FILENAME)
     
     def load_nouns(self):
         """Carica i sostantivi da nomi.csv"""
-        filepath = os.path.join(self.assets_dir, 'nomi.csv')
-        nouns = []
+        return self._load('nomi.csv', 'dei sostantivi')
+    
+    def load_verbs(self):
+        """Carica i verbi da verbi.csv"""
+        return self._load('verbi.csv', 'dei verbi')
+    
+    def load_adjectives(self):
+        """Carica gli aggettivi da aggettivi.csv"""
+        return self._load('aggettivi.csv', 'degli aggettivi')
+    
+    def get_vocabulary(self, game_type):
+        """
+        Restituisce il Vocabulary (parole + indici) di una categoria
+        
+        Il Vocabulary è quello in cache, senza copiare la lista delle parole.
+        
+        Returns:
+            Vocabulary, oppure None se la categoria non esiste o non è caricabile
+        """
+        filename = self.GAME_TYPES.get(game_type)
+        if filename is None:
+            return None
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    noun = Noun(
-                        german=row['Sostantivo'],
-                        article=row['Articolo'],
-                        plural=row['Plurale'],
-                        italian=row['Significato'],
-                        frequency=row['Frequenza']
-                    )
-                    nouns.append(noun)
+            with _cache_lock:
+                return self._get_vocabulary(filename)
+        except VOCABULARY_ERRORS:
+            return None
+    
+    def get_vocabularies(self):
+        """Vocabulary di tutte le categorie caricabili"""
+        vocabularies = (self.get_vocabulary(game_type) for game_type in self.GAME_TYPES)
+        return [vocabulary for vocabulary in vocabularies if vocabulary is not None]
+    
+    def load_words(self, game_type):
+        """Carica le parole di una categoria ('Nomi', 'Verbi', 'Aggettivi')"""
+        if game_type == 'Nomi':
+            return self.load_nouns()
+        elif game_type == 'Verbi':
+            return self.load_verbs()
+        elif game_type == 'Aggettivi':
+            return self.load_adjectives()
+        return []
+    
+    # ==================== CACHE ====================
+    
+    def _load(self, filename, label):
+        """
+        Restituisce le parole di un CSV passando dalla cache di processo
+        
+        Le istanze delle parole sono condivise tra tutti i chiamanti, la lista
+        restituita invece è sempre una copia (i chiamanti la mescolano sul posto).
+        """
+        filepath = os.path.join(self.assets_dir, filename)
+        
+        try:
+            with _cache_lock:
+                vocabulary = self._get_vocabulary(filename)
         except FileNotFoundError:
             print(f"❌ Errore: File {filepath} non trovato!")
             return []
         except Exception as e:
-            print(f"❌ Errore nel caricamento dei sostantivi: {e}")
+            print(f"❌ Errore nel caricamento {label}: {e}")
             return []
         
-        return nouns
+        return WordList(vocabulary)
     
-    def load_verbs(self):
-        """Carica i verbi da verbi.csv"""
-        filepath = os.path.join(self.assets_dir, 'verbi.csv')
-        verbs = []
+    def _get_vocabulary(self, filename):
+        """
+        Restituisce il vocabolario in cache, aggiornando lo snapshot se il CSV è cambiato
+        
+        Va chiamato tenendo _cache_lock.
+        """
+        filepath = os.path.abspath(os.path.join(self.assets_dir, filename))
+        
+        if filepath not in _vocabulary_cache:
+            # Primo accesso nel processo: una sola lettura carica tutte le categorie
+            self._read_snapshot()
+        
+        entry, changed = self._refresh_entry(filename)
+        if changed:
+            self._write_snapshot()
+        return entry.vocabulary
+    
+    def _refresh_entry(self, filename):
+        """
+        Verifica che la voce in cache corrisponda al CSV, rileggendolo se serve
+        
+        Il controllo su mtime/dimensione è gratuito; se la firma cambia ma lo
+        sha1 del contenuto è identico (file solo "toccato") le parole restano
+        valide. Ritorna (voce, cambiata).
+        """
+        filepath = os.path.abspath(os.path.join(self.assets_dir, filename))
+        signature = _file_signature(filepath)
+        entry = _vocabulary_cache.get(filepath)
+        if entry is not None and entry.signature == signature:
+            return entry, False
+        
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        
+        if entry is not None and entry.digest == digest:
+            entry.signature = signature
+            return entry, True
+        
+        parse = getattr(self, self.SOURCES[filename])
+        reader = csv.DictReader(io.StringIO(data.decode('utf-8'), newline=''))
+        entry = _CacheEntry(signature, digest, Vocabulary(parse(reader)))
+        _vocabulary_cache[filepath] = entry
+        return entry, True
+    
+    # ==================== SNAPSHOT ====================
+    
+    def build_snapshot(self):
+        """
+        Compila i tre CSV nello snapshot binario (passo di build)
+        
+        Returns:
+            str: percorso dello snapshot scritto
+        """
+        with _cache_lock:
+            for filename in self.SOURCES:
+                self._refresh_entry(filename)
+            self._write_snapshot(raise_errors=True)
+        return self.snapshot_path
+    
+    def check_snapshot(self):
+        """
+        Verifica che lo snapshot scritto si ricarichi in un altro processo
+        (controllo dopo il passo di build)
         
+        Returns:
+            bool: True se lo snapshot è leggibile, aggiornato e completo
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    verb = Verb(
-                        german=row['Verbo'],
-                        regular=row['Regolare'],
-                        italian=row['Significato'],
-                        prateritum=row['Präteritum'],
-                        participio=row['Participio passato'],
-                        perfetto=row['Perfetto'],
-                        caso=row['Caso'],
-                        riflessivo=row['Riflessivo'],
-                        frequency=row['Frequenza']
-                    )
-                    verbs.append(verb)
-        except FileNotFoundError:
-            print(f"❌ Errore: File {filepath} non trovato!")
-            return []
-        except Exception as e:
-            print(f"❌ Errore nel caricamento dei verbi: {e}")
-            return []
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = _SnapshotUnpickler(f).load()
+        except SNAPSHOT_READ_ERRORS:
+            return False
         
-        return verbs
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+            return False
+        return set(snapshot.get('sources', {})) == set(self.SOURCES)
     
-    def load_adjectives(self):
-        """Carica gli aggettivi da aggettivi.csv"""
-        filepath = os.path.join(self.assets_dir, 'aggettivi.csv')
-        adjectives = []
+    def _read_snapshot(self):
+        """
+        Popola la cache dallo snapshot binario, se presente e compatibile
         
+        Le firme dei file vengono verificate subito dopo da _refresh_entry:
+        una voce non più aggiornata viene semplicemente ricaricata dal CSV.
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    adj = Adjective(
-                        german=row['Aggettivo'],
-                        comparative=row['Comparativo'],
-                        superlative=row['Superlativo'],
-                        italian=row['Significato'],
-                        frequency=row['Frequenza']
-                    )
-                    adjectives.append(adj)
-        except FileNotFoundError:
-            print(f"❌ Errore: File {filepath} non trovato!")
-            return []
-        except Exception as e:
-            print(f"❌ Errore nel caricamento degli aggettivi: {e}")
-            return []
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = _SnapshotUnpickler(f).load()
+        except SNAPSHOT_READ_ERRORS:
+            return
+        
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+            return
         
-        return adjectives
+        for filename, (signature, digest, vocabulary) in snapshot['sources'].items():
+            filepath = os.path.abspath(os.path.join(self.assets_dir, filename))
+            if filename in self.SOURCES and filepath not in _vocabulary_cache:
+                _vocabulary_cache[filepath] = _CacheEntry(signature, digest, vocabulary)
+    
+    def _write_snapshot(self, raise_errors=False):
+        """
+        Scrive lo snapshot in modo atomico (file temporaneo + rename)
+        
+        Un errore di scrittura (es. cartella in sola lettura) non è fatale:
+        si continuerà semplicemente a leggere i CSV.
+        """
+        try:
+            sources = {}
+            for filename in self.SOURCES:
+                entry, _ = self._refresh_entry(filename)
+                sources[filename] = (entry.signature, entry.digest, entry.vocabulary)
+            
+            snapshot = {'version': SNAPSHOT_VERSION, 'sources': sources}
+            fd, tmp_path = tempfile.mkstemp(dir=self.assets_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            if raise_errors:
+                raise
+    
+    # ==================== PARSING ====================
+    
+    @staticmethod
+    def _parse_nouns(rows):
+        """Crea i sostantivi dalle righe di nomi.csv"""
+        return [
+            Noun(
+                german=row['Sostantivo'],
+                article=row['Articolo'],
+                plural=row['Plurale'],
+                italian=row['Significato'],
+                frequency=row['Frequenza']
+            )
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _parse_verbs(rows):
+        """Crea i verbi dalle righe di verbi.csv"""
+        return [
+            Verb(
+                german=row['Verbo'],
+                regular=row['Regolare'],
+                italian=row['Significato'],
+                prateritum=row['Präteritum'],
+                participio=row['Participio passato'],
+                perfetto=row['Perfetto'],
+                caso=row['Caso'],
+                riflessivo=row['Riflessivo'],
+                frequency=row['Frequenza']
+            )
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _parse_adjectives(rows):
+        """Crea gli aggettivi dalle righe di aggettivi.csv"""
+        return [
+            Adjective(
+                german=row['Aggettivo'],
+                comparative=row['Comparativo'],
+                superlative=row['Superlativo'],
+                italian=row['Significato'],
+                frequency=row['Frequenza']
+            )
+            for row in rows
+        ]
     
     def get_words_by_difficulty(self, words, difficulty_mode, difficulty_level=None):
         """
@@ -104,7 +459,13 @@ class DataLoader:
         
         Returns:
             lista di parole filtrate
+        
+        Se words è una lista completa restituita da DataLoader il filtro usa
+        l'indice per frequenza del vocabolario (l'ordine segue i livelli),
+        altrimenti scorre la lista.
         """
+        vocabulary = _vocabulary_of(words)
+        
         if difficulty_mode == 'casual':
             return words
         
@@ -112,12 +473,16 @@ class DataLoader:
             if difficulty_level is None:
                 return words
             # Tutte le parole con frequenza <= al livello selezionato
+            if vocabulary is not None:
+                return vocabulary.words_up_to_level(difficulty_level)
             return [word for word in words if word.frequency <= difficulty_level]
         
         elif difficulty_mode == 'focus':
             if difficulty_level is None:
                 return words
             # Solo parole con frequenza = al livello selezionato
+            if vocabulary is not None:
+                return vocabulary.words_at_level(difficulty_level)
             return [word for word in words if word.frequency == difficulty_level]
         
         return words
@@ -129,8 +494,33 @@ class DataLoader:
         Returns:
             dict con conteggi per ogni livello di difficoltà
         """
+        vocabulary = _vocabulary_of(words)
+        if vocabulary is not None:
+            return dict(vocabulary.frequency_counts)
+        
         stats = {}
         for word in words:
             freq = word.frequency
             stats[freq] = stats.get(freq, 0) + 1
         return stats
+    
+    def count_words_up_to_level(self, words, level):
+        """Numero di parole con frequenza <= level (dai conteggi del vocabolario se possibile)"""
+        vocabulary = _vocabulary_of(words)
+        if vocabulary is not None:
+            return vocabulary.count_up_to_level(level)
+        return sum(1 for word in words if word.frequency <= level)
+
+
+if __name__ == '__main__':
+    # Passo di build: python -m src.data_loader
+    # Eseguito con -m questo modulo è __main__: lo snapshot deve contenere le
+    # classi di src.data_loader, quelle che l'applicazione importa
+    import sys
+    from src.data_loader import DataLoader
+    
+    loader = DataLoader()
+    path = loader.build_snapshot()
+    if not loader.check_snapshot():
+        sys.exit(f"❌ Lo snapshot {path} non si ricarica")
+    print(f"✅ Snapshot del vocabolario scritto in {path}")
@@ -1,8 +1,12 @@
 # ==================== src/database.py ====================
 
 import os
-from datetime import datetime
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from .connection_pool import get_pool
 
 # Carica variabili d'ambiente da .env (se esiste)
 load_dotenv()
@@ -20,115 +24,221 @@ if DATABASE_URL:
 if DATABASE_URL and DATABASE_URL.startswith('postgres'):
     # PostgreSQL
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    from psycopg2.extras import RealDictCursor, execute_values
     USE_POSTGRES = True
     print("🐘 Database: PostgreSQL")
     print(f"   Host: {DATABASE_URL.split('@')[1].split('/')[0] if '@' in DATABASE_URL else 'unknown'}")
 else:
     # SQLite (default)
-    import sqlite3
     USE_POSTGRES = False
     print("💾 Database: SQLite (locale)")
 
+# File SQLite locale (database principale senza DATABASE_URL, giornale in modalità ibrida)
+LOCAL_DB_PATH = 'game_history.db'
+
+# Modalità ibrida: le partite vengono scritte nel SQLite locale e poi
+# sincronizzate con PostgreSQL in background (vedi src/sync.py)
+HYBRID_MODE = USE_POSTGRES and (os.getenv('DATABASE_MODE') or '').strip().lower() == 'hybrid'
+
+if HYBRID_MODE:
+    print("🔄 Modalità ibrida: partite salvate in locale e sincronizzate con PostgreSQL")
+
+
+# Errori con cui il driver rifiuta i dati di una partita (vincoli violati,
+# valori troppo lunghi): riprovare non servirebbe. Gli altri errori del
+# database (connessione, lock, pool chiuso) sono temporanei. Gli errori
+# Python (KeyError, TypeError...) sono bug e non rientrano qui: la forma
+# della partita va controllata prima (vedi write_behind.check_game).
+DATA_ERRORS = (sqlite3.IntegrityError, sqlite3.DataError)
+if USE_POSTGRES:
+    DATA_ERRORS += (psycopg2.IntegrityError, psycopg2.DataError)
+
+
+def is_data_error(error):
+    """True se l'errore dipende dai dati della partita e non dal database"""
+    return isinstance(error, DATA_ERRORS)
+
+
+# Tipo di sessione delle partite il cui game_type non ha suffisso (es. 'Nomi')
+DEFAULT_SESSION_KIND = 'Normale'
+
+
+def split_game_type(game_type):
+    """
+    Separa la categoria base dal tipo di sessione
+    
+    Esempi:
+        'Nomi'                            -> ('Nomi', 'Normale')
+        'Nomi (Ripasso)'                  -> ('Nomi', 'Ripasso')
+        'Verbi (Studio Approfondito)'     -> ('Verbi', 'Studio Approfondito')
+    """
+    base, sep, rest = game_type.partition(' (')
+    if sep and rest.endswith(')'):
+        return base, rest[:-1]
+    return game_type, DEFAULT_SESSION_KIND
+
+
+# Origine dei timestamp SQLite, salvati come secondi interi dal 1970-01-01.
+# L'ora locale (naive) viene contata come se fosse UTC: così le funzioni
+# data di SQLite con 'unixepoch' restituiscono già il giorno locale.
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(moment):
+    """datetime -> secondi dall'epoca, come salvati in SQLite"""
+    return (moment - EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(seconds):
+    """Secondi dall'epoca salvati in SQLite -> datetime"""
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def recompute_word_error_stats(cursor):
+    """Ricalcola word_error_stats dagli errori grezzi (stessa SQL per i due database)"""
+    cursor.execute("DELETE FROM word_error_stats")
+    cursor.execute("""
+        INSERT INTO word_error_stats (word_german, word_italian, category,
+                                      error_count, penalty_sum, last_seen)
+        SELECT e.word_german, e.word_italian, g.category,
+               COUNT(*), SUM(e.penalty), MAX(g.timestamp)
+        FROM errors e
+        JOIN games g ON e.game_id = g.id
+        GROUP BY e.word_german, e.word_italian, g.category
+    """)
+
+
+# Database il cui schema è già stato creato in questo processo
+_bootstrapped = set()
+_bootstrap_lock = threading.Lock()
+
+# Contatore delle scritture di questo processo per database, incrementato da
+# save_game: le cache delle statistiche lo confrontano (vedi generation)
+_generations = {}
+_generations_lock = threading.Lock()
+
+# Istanza condivisa restituita da get_database_manager()
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_database_manager():
+    """
+    Restituisce il DatabaseManager condiviso dal processo
+    
+    Tutti i componenti (CLI, ripasso, statistiche, pagine Streamlit) usano
+    la stessa istanza e quindi lo stesso pool di connessioni.
+    """
+    global _shared_manager
+    
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = DatabaseManager()
+            
+            if HYBRID_MODE:
+                from .sync import get_sync_engine
+                get_sync_engine(local=_shared_manager).start()
+            else:
+                # Dopo un periodo in modalità ibrida l'indice non serve più
+                _shared_manager.set_sync_index(False)
+        return _shared_manager
+
 
 class DatabaseManager:
     """Gestisce il database (SQLite o PostgreSQL) per salvare partite ed errori"""
     
-    def __init__(self):
-        self.use_postgres = USE_POSTGRES
+    def __init__(self, database_url=None, db_path=None):
+        """
+        Args:
+            database_url: URL PostgreSQL da usare al posto di quello configurato
+            db_path: file SQLite da usare al posto di quello configurato
+        
+        Senza argomenti usa PostgreSQL se DATABASE_URL è impostato (e la
+        modalità ibrida non è attiva), altrimenti il SQLite locale.
+        """
+        if database_url is None and db_path is None:
+            if USE_POSTGRES and not HYBRID_MODE:
+                database_url = DATABASE_URL
+            else:
+                db_path = LOCAL_DB_PATH
+        
+        self.use_postgres = database_url is not None
         
         if self.use_postgres:
-            self.db_url = DATABASE_URL
-            self._create_tables_postgres()
+            self.db_url = database_url
+            self.pool = get_pool(database_url=self.db_url)
         else:
-            self.db_path = 'game_history.db'
-            self._create_tables_sqlite()
+            self.db_path = db_path
+            self.pool = get_pool(db_path=self.db_path)
+        
+        self._bootstrap_schema()
     
-    # ==================== CREAZIONE TABELLE ====================
+    @property
+    def database_key(self):
+        """Identifica il database a cui punta questo manager"""
+        if self.use_postgres:
+            return ('postgres', self.db_url)
+        return ('sqlite', os.path.abspath(self.db_path))
     
-    def _create_tables_sqlite(self):
-        """Crea le tabelle per SQLite"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS games (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                game_type TEXT NOT NULL,
-                mode TEXT NOT NULL,
-                total_questions INTEGER NOT NULL,
-                correct_answers INTEGER NOT NULL,
-                success_rate REAL NOT NULL
-            )
-        """)
+    @property
+    def generation(self):
+        """
+        Versione dei dati per le cache delle statistiche
         
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS errors (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game_id INTEGER NOT NULL,
-                word_german TEXT NOT NULL,
-                word_italian TEXT NOT NULL,
-                user_answer TEXT NOT NULL,
-                correct_answer TEXT NOT NULL,
-                penalty REAL NOT NULL,
-                FOREIGN KEY (game_id) REFERENCES games(id)
-            )
-        """)
+        Il numero di scritture di questo processo (save_game,
+        rebuild_word_error_stats), senza query. In SQLite si aggiunge PRAGMA
+        data_version, che cambia anche con le partite salvate da altri
+        processi sullo stesso file (es. CLI e Streamlit).
         
-        conn.commit()
-        conn.close()
+        In PostgreSQL le partite salvate da altri processi non cambiano la
+        generazione: le cache le vedono dopo al più STATS_CACHE_TTL secondi.
+        """
+        writes = _generations.get(self.database_key, 0)
+        if self.use_postgres:
+            return writes
+        return (writes, self.pool.data_version())
     
-    def _create_tables_postgres(self):
-        """Crea le tabelle per PostgreSQL"""
-        conn = psycopg2.connect(self.db_url)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS games (
-                id SERIAL PRIMARY KEY,
-                timestamp TIMESTAMP NOT NULL,
-                game_type VARCHAR(50) NOT NULL,
-                mode VARCHAR(50) NOT NULL,
-                total_questions INTEGER NOT NULL,
-                correct_answers INTEGER NOT NULL,
-                success_rate REAL NOT NULL
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS errors (
-                id SERIAL PRIMARY KEY,
-                game_id INTEGER NOT NULL,
-                word_german VARCHAR(200) NOT NULL,
-                word_italian VARCHAR(200) NOT NULL,
-                user_answer VARCHAR(200) NOT NULL,
-                correct_answer VARCHAR(200) NOT NULL,
-                penalty REAL NOT NULL,
-                FOREIGN KEY (game_id) REFERENCES games(id)
-            )
-        """)
+    def _bump_generation(self):
+        """Segnala alle cache che i dati sono cambiati"""
+        key = self.database_key
+        with _generations_lock:
+            _generations[key] = _generations.get(key, 0) + 1
+    
+    def _bootstrap_schema(self):
+        """Porta lo schema all'ultima versione una sola volta per processo e per database"""
+        key = self.database_key
+        if key in _bootstrapped:
+            return
         
-        conn.commit()
-        conn.close()
+        with _bootstrap_lock:
+            if key in _bootstrapped:
+                return
+            # Import ritardato: src.migrations importa da questo modulo
+            from .migrations import MigrationRunner
+            MigrationRunner(self.pool, self.use_postgres).migrate()
+            _bootstrapped.add(key)
     
     # ==================== CONNESSIONE ====================
     
     def _get_connection(self):
-        """Restituisce una connessione al database"""
-        if self.use_postgres:
-            return psycopg2.connect(self.db_url)
-        else:
-            return sqlite3.connect(self.db_path)
+        """
+        Presta una connessione del pool condiviso, da usare con 'with'
+        
+        Al termine del blocco la connessione torna al pool e un'eventuale
+        transazione non confermata viene annullata.
+        """
+        return self.pool.connection()
     
     # ==================== SALVATAGGIO ====================
     
-    def save_game(self, game_type, mode, total_questions, correct_answers, errors):
+    def save_game(self, game_type, mode, total_questions, correct_answers, errors,
+                  timestamp=None, game_uuid=None):
         """
         Salva una partita nel database
         
         Args:
-            game_type: str ('Nomi', 'Verbi', 'Aggettivi')
+            game_type: str ('Nomi', 'Verbi', 'Aggettivi', eventualmente con
+                       il tipo di sessione, es. 'Nomi (Ripasso)')
             mode: str ('Traduzione', 'Articoli', 'Coniugazioni')
             total_questions: int
             correct_answers: int
@@ -138,94 +248,370 @@ class DatabaseManager:
                 - user_answer
                 - correct_answer
                 - penalty
+            timestamp: datetime di fine partita (default: adesso)
+            game_uuid: identificativo univoco della partita (default: generato);
+                       una partita con un uuid già presente non viene salvata
         
         Returns:
-            game_id: int (ID della partita salvata)
+            game_id: int (ID della partita salvata, None se era già presente)
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        return self.save_games([{
+            'game_type': game_type,
+            'mode': mode,
+            'total_questions': total_questions,
+            'correct_answers': correct_answers,
+            'errors': errors,
+            'timestamp': timestamp,
+            'game_uuid': game_uuid,
+        }])[0]
+    
+    def save_games(self, games):
+        """
+        Salva più partite in un'unica transazione
+        
+        Args:
+            games: list di dict con gli argomenti di save_game
         
+        Returns:
+            list degli ID delle partite salvate (None per quelle già presenti)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            game_ids = [self._insert_game(cursor, **game) for game in games]
+            
+            # Partite, errori e aggregato vengono confermati nella stessa transazione
+            conn.commit()
+            self._bump_generation()
+        
+        return game_ids
+    
+    def _insert_game(self, cursor, game_type, mode, total_questions, correct_answers, errors,
+                     timestamp=None, game_uuid=None):
+        """
+        Inserisce partita, errori e aggiornamento dell'aggregato (senza commit)
+        
+        Se esiste già una partita con lo stesso uuid non inserisce nulla e
+        restituisce None: così una partita rinviata dopo un errore o un crash
+        non viene mai contata due volte.
+        """
         success_rate = (correct_answers / total_questions * 100) if total_questions > 0 else 0
+        category, session_kind = split_game_type(game_type)
+        game_uuid = game_uuid or str(uuid.uuid4())
         
         if self.use_postgres:
             # PostgreSQL usa TIMESTAMP e RETURNING
             cursor.execute("""
                 INSERT INTO games (timestamp, game_type, mode, total_questions, 
-                                 correct_answers, success_rate)
-                VALUES (NOW(), %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (game_type, mode, total_questions, correct_answers, success_rate))
+                                 correct_answers, success_rate, category, session_kind, uuid)
+                VALUES (COALESCE(%s, NOW()), %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (uuid) DO NOTHING
+                RETURNING id, timestamp
+            """, (timestamp, game_type, mode, total_questions, correct_answers, success_rate,
+                  category, session_kind, game_uuid))
             
-            game_id = cursor.fetchone()[0]
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            game_id, timestamp = row
             
-            # Salva gli errori
-            for error in errors:
-                cursor.execute("""
+            # Salva gli errori con un solo INSERT multi-riga
+            if errors:
+                execute_values(cursor, """
                     INSERT INTO errors (game_id, word_german, word_italian, 
-                                      user_answer, correct_answer, penalty)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                """, (game_id, error['word_german'], error['word_italian'],
-                      error['user_answer'], error['correct_answer'], error['penalty']))
+                                      user_answer, correct_answer, penalty, confused_with)
+                    VALUES %s
+                """, self._error_rows(game_id, errors), page_size=500)
+                
+                # Una sola riga per parola: ON CONFLICT non può aggiornare
+                # due volte la stessa riga nello stesso INSERT
+                execute_values(cursor, """
+                    INSERT INTO word_error_stats AS s (word_german, word_italian, category,
+                                                       error_count, penalty_sum, last_seen)
+                    VALUES %s
+                    ON CONFLICT (word_german, word_italian, category) DO UPDATE SET
+                        error_count = s.error_count + EXCLUDED.error_count,
+                        penalty_sum = s.penalty_sum + EXCLUDED.penalty_sum,
+                        last_seen = GREATEST(s.last_seen, EXCLUDED.last_seen)
+                """, [row + (timestamp,) for row in self._word_stat_rows(category, errors)],
+                    page_size=500)
         
         else:
             # SQLite
-            timestamp = datetime.now().isoformat()
+            timestamp = to_epoch(timestamp or datetime.now())
             cursor.execute("""
                 INSERT INTO games (timestamp, game_type, mode, total_questions, 
-                                 correct_answers, success_rate)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (timestamp, game_type, mode, total_questions, correct_answers, success_rate))
+                                 correct_answers, success_rate, category, session_kind, uuid)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (uuid) DO NOTHING
+            """, (timestamp, game_type, mode, total_questions, correct_answers, success_rate,
+                  category, session_kind, game_uuid))
             
+            if cursor.rowcount == 0:
+                return None
             game_id = cursor.lastrowid
             
-            # Salva gli errori
-            for error in errors:
-                cursor.execute("""
-                    INSERT INTO errors (game_id, word_german, word_italian, 
-                                      user_answer, correct_answer, penalty)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (game_id, error['word_german'], error['word_italian'],
-                      error['user_answer'], error['correct_answer'], error['penalty']))
-        
-        conn.commit()
-        conn.close()
+            # Salva gli errori in blocco
+            cursor.executemany("""
+                INSERT INTO errors (game_id, word_german, word_italian, 
+                                  user_answer, correct_answer, penalty, confused_with)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, self._error_rows(game_id, errors))
+            
+            cursor.executemany("""
+                INSERT INTO word_error_stats (word_german, word_italian, category,
+                                              error_count, penalty_sum, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (word_german, word_italian, category) DO UPDATE SET
+                    error_count = error_count + excluded.error_count,
+                    penalty_sum = penalty_sum + excluded.penalty_sum,
+                    last_seen = MAX(last_seen, excluded.last_seen)
+            """, [row + (timestamp,) for row in self._word_stat_rows(category, errors)])
         
         return game_id
     
-    # ==================== QUERY ====================
+    @staticmethod
+    def _error_rows(game_id, errors):
+        """
+        Converte i dict degli errori nelle tuple da inserire in errors
+        
+        confused_with è facoltativo: lemma scritto al posto di quello richiesto
+        """
+        return [
+            (game_id, error['word_german'], error['word_italian'],
+             error['user_answer'], error['correct_answer'], error['penalty'],
+             error.get('confused_with'))
+            for error in errors
+        ]
     
-    def get_most_common_errors(self, limit=10):
-        """Ottiene le parole più sbagliate"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+    @staticmethod
+    def _word_stat_rows(category, errors):
+        """
+        Raggruppa gli errori della partita per parola
+        
+        Returns:
+            list di tuple (word_german, word_italian, category, error_count, penalty_sum)
+        """
+        totals = {}
+        for error in errors:
+            key = (error['word_german'], error['word_italian'])
+            count, penalty = totals.get(key, (0, 0.0))
+            totals[key] = (count + 1, penalty + error['penalty'])
+        
+        return [
+            (german, italian, category, count, penalty)
+            for (german, italian), (count, penalty) in totals.items()
+        ]
+    
+    def rebuild_word_error_stats(self):
+        """
+        Ricalcola da zero l'aggregato word_error_stats dalla tabella errors
+        
+        Returns:
+            int: numero di righe dell'aggregato
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            recompute_word_error_stats(cursor)
+            cursor.execute("SELECT COUNT(*) FROM word_error_stats")
+            rows = cursor.fetchone()[0]
+            conn.commit()
+            self._bump_generation()
+        
+        return rows
+    
+    # ==================== SINCRONIZZAZIONE ====================
+    
+    def set_sync_index(self, enabled=True):
+        """
+        Crea o elimina l'indice parziale delle partite da sincronizzare (solo SQLite)
         
+        Serve solo al SyncEngine: fuori dalla modalità ibrida le partite
+        restano synced = 0 e l'indice coprirebbe tutta la tabella. Creato di
+        nuovo, copre anche lo storico salvato nel frattempo, che viene così
+        sincronizzato.
+        """
         if self.use_postgres:
+            return
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if enabled:
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_unsynced ON games (id) WHERE synced = 0")
+            else:
+                cursor.execute("DROP INDEX IF EXISTS idx_games_unsynced")
+            conn.commit()
+    
+    def get_unsynced_games(self, limit=100):
+        """
+        Partite del SQLite locale non ancora inviate al database remoto
+        
+        Returns:
+            list di dict con gli argomenti di save_game (incluso game_uuid)
+            e la chiave local_id, dalla più vecchia
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute("""
-                SELECT word_german, word_italian, COUNT(*) as error_count
+                SELECT id, uuid, timestamp, game_type, mode, total_questions, correct_answers
+                FROM games
+                WHERE synced = 0
+                ORDER BY id
+                LIMIT ?
+            """, (limit,))
+            rows = cursor.fetchall()
+            
+            if not rows:
+                return []
+            
+            errors = {row[0]: [] for row in rows}
+            placeholders = ', '.join('?' * len(rows))
+            cursor.execute(f"""
+                SELECT game_id, word_german, word_italian, user_answer, correct_answer, penalty,
+                       confused_with
                 FROM errors
+                WHERE game_id IN ({placeholders})
+                ORDER BY id
+            """, list(errors))
+            
+            for (game_id, german, italian, user_answer, correct_answer, penalty,
+                 confused_with) in cursor.fetchall():
+                errors[game_id].append({
+                    'word_german': german,
+                    'word_italian': italian,
+                    'user_answer': user_answer,
+                    'correct_answer': correct_answer,
+                    'penalty': penalty,
+                    'confused_with': confused_with
+                })
+        
+        return [
+            {
+                'local_id': local_id,
+                'game_uuid': game_uuid,
+                'timestamp': from_epoch(timestamp),
+                'game_type': game_type,
+                'mode': mode,
+                'total_questions': total_questions,
+                'correct_answers': correct_answers,
+                'errors': errors[local_id],
+            }
+            for local_id, game_uuid, timestamp, game_type, mode, total_questions, correct_answers in rows
+        ]
+    
+    def mark_games_synced(self, local_ids):
+        """Segna come sincronizzate le partite locali indicate"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE games SET synced = 1 WHERE id = ?",
+                               [(local_id,) for local_id in local_ids])
+            conn.commit()
+    
+    def mark_games_rejected(self, local_ids):
+        """
+        Mette da parte le partite locali rifiutate dal database remoto (synced = -1)
+        
+        Non vengono più inviate, così non bloccano le successive; si rimettono
+        in coda con requeue_rejected_games.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE games SET synced = -1 WHERE id = ?",
+                               [(local_id,) for local_id in local_ids])
+            conn.commit()
+    
+    def requeue_rejected_games(self):
+        """
+        Rimette in coda di sincronizzazione le partite rifiutate
+        
+        Returns:
+            int: partite rimesse in coda
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE games SET synced = 0 WHERE synced = -1")
+            count = cursor.rowcount
+            conn.commit()
+        return count
+    
+    def count_unsynced_games(self):
+        """Numero di partite locali in attesa di sincronizzazione"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM games WHERE synced = 0")
+            return cursor.fetchone()[0]
+    
+    def count_rejected_games(self):
+        """Numero di partite locali rifiutate dal database remoto"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM games WHERE synced = -1")
+            return cursor.fetchone()[0]
+    
+    # ==================== QUERY ====================
+    
+    def get_most_common_errors(self, limit=10):
+        """Ottiene le parole più sbagliate (dall'aggregato word_error_stats)"""
+        with self._get_connection() as conn:
+            return self._fetch_most_common_errors(conn.cursor(), limit)
+    
+    def _fetch_most_common_errors(self, cursor, limit):
+        if self.use_postgres:
+            cursor.execute("""
+                SELECT word_german, word_italian, SUM(error_count) as error_count
+                FROM word_error_stats
                 GROUP BY word_german, word_italian
                 ORDER BY error_count DESC
                 LIMIT %s
             """, (limit,))
         else:
             cursor.execute("""
-                SELECT word_german, word_italian, COUNT(*) as error_count
-                FROM errors
+                SELECT word_german, word_italian, SUM(error_count) as error_count
+                FROM word_error_stats
                 GROUP BY word_german, word_italian
                 ORDER BY error_count DESC
                 LIMIT ?
             """, (limit,))
         
-        results = cursor.fetchall()
-        conn.close()
+        return cursor.fetchall()
+    
+    def get_most_confused_pairs(self, limit=10):
+        """
+        Coppie di parole confuse più spesso (parola richiesta, parola scritta)
         
-        return results
+        Returns:
+            list di tuple (word_german, word_italian, confused_with, count)
+        """
+        with self._get_connection() as conn:
+            return self._fetch_most_confused_pairs(conn.cursor(), limit)
+    
+    def _fetch_most_confused_pairs(self, cursor, limit):
+        if self.use_postgres:
+            cursor.execute("""
+                SELECT word_german, word_italian, confused_with, COUNT(*) as confusion_count
+                FROM errors
+                WHERE confused_with IS NOT NULL
+                GROUP BY word_german, word_italian, confused_with
+                ORDER BY confusion_count DESC
+                LIMIT %s
+            """, (limit,))
+        else:
+            cursor.execute("""
+                SELECT word_german, word_italian, confused_with, COUNT(*) as confusion_count
+                FROM errors
+                WHERE confused_with IS NOT NULL
+                GROUP BY word_german, word_italian, confused_with
+                ORDER BY confusion_count DESC
+                LIMIT ?
+            """, (limit,))
+        
+        return cursor.fetchall()
     
     def get_game_history(self, limit=10):
         """Ottiene lo storico delle ultime partite"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
+        with self._get_connection() as conn:
+            return self._fetch_game_history(conn.cursor(), limit)
+    
+    def _fetch_game_history(self, cursor, limit):
         if self.use_postgres:
             cursor.execute("""
                 SELECT id, timestamp, game_type, mode, total_questions, 
@@ -243,10 +629,13 @@ class DatabaseManager:
                 LIMIT ?
             """, (limit,))
         
-        results = cursor.fetchall()
-        conn.close()
-        
-        return results
+        return self._game_rows(cursor.fetchall())
+    
+    def _game_rows(self, rows):
+        """Righe (id, timestamp, ...) di games con il timestamp sempre come datetime"""
+        if self.use_postgres:
+            return rows
+        return [(row[0], from_epoch(row[1])) + tuple(row[2:]) for row in rows]
     
     def get_most_common_errors_by_type(self, game_type, min_errors=2):
         """
@@ -259,70 +648,319 @@ class DatabaseManager:
         Returns:
             list di tuple (word_german, word_italian, error_count)
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        if self.use_postgres:
-            cursor.execute("""
-                SELECT e.word_german, e.word_italian, COUNT(*) as error_count
-                FROM errors e
-                JOIN games g ON e.game_id = g.id
-                WHERE g.game_type LIKE %s
-                GROUP BY e.word_german, e.word_italian
-                HAVING COUNT(*) >= %s
-                ORDER BY error_count DESC
-            """, (f"%{game_type}%", min_errors))
-        else:
-            cursor.execute("""
-                SELECT e.word_german, e.word_italian, COUNT(*) as error_count
-                FROM errors e
-                JOIN games g ON e.game_id = g.id
-                WHERE g.game_type LIKE ?
-                GROUP BY e.word_german, e.word_italian
-                HAVING error_count >= ?
-                ORDER BY error_count DESC
-            """, (f"%{game_type}%", min_errors))
-        
-        results = cursor.fetchall()
-        conn.close()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.use_postgres:
+                cursor.execute("""
+                    SELECT word_german, word_italian, error_count
+                    FROM word_error_stats
+                    WHERE category = %s AND error_count >= %s
+                    ORDER BY error_count DESC
+                """, (game_type, min_errors))
+            else:
+                cursor.execute("""
+                    SELECT word_german, word_italian, error_count
+                    FROM word_error_stats
+                    WHERE category = ? AND error_count >= ?
+                    ORDER BY error_count DESC
+                """, (game_type, min_errors))
+            
+            results = cursor.fetchall()
         
         return results
     
     def get_stats_by_type(self, game_type):
         """Ottiene statistiche per un tipo di gioco"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.use_postgres:
+                cursor.execute("""
+                    SELECT 
+                        COUNT(*) as games,
+                        AVG(success_rate) as avg_success,
+                        SUM(total_questions) as total_questions
+                    FROM games
+                    WHERE category = %s
+                """, (game_type,))
+            else:
+                cursor.execute("""
+                    SELECT 
+                        COUNT(*) as games,
+                        AVG(success_rate) as avg_success,
+                        SUM(total_questions) as total_questions
+                    FROM games
+                    WHERE category = ?
+                """, (game_type,))
+            
+            result = cursor.fetchone()
+        
+        if result and result[0] > 0:
+            return {
+                'games': result[0],
+                'avg_success': result[1],
+                'total_questions': result[2]
+            }
+        return None
+    
+    def get_stats_by_category(self):
+        """
+        Statistiche di tutte le categorie con una sola query
+        
+        Returns:
+            dict {categoria: dict come get_stats_by_type}
+        """
+        with self._get_connection() as conn:
+            return self._fetch_stats_by_category(conn.cursor())
+    
+    @staticmethod
+    def _fetch_stats_by_category(cursor):
+        cursor.execute("""
+            SELECT category, COUNT(*), AVG(success_rate), SUM(total_questions)
+            FROM games
+            GROUP BY category
+        """)
+        
+        return {
+            category: {
+                'games': games,
+                'avg_success': avg_success,
+                'total_questions': total_questions
+            }
+            for category, games, avg_success, total_questions in cursor.fetchall()
+        }
+    
+    # ==================== STATISTICHE ====================
+    
+    def get_overall_stats(self):
+        """
+        Totali e medie calcolati su tutte le partite
+        
+        Returns:
+            dict con games, total_questions, total_correct, avg_success
+            oppure None se non ci sono partite
+        """
+        with self._get_connection() as conn:
+            return self._fetch_overall_stats(conn.cursor())
+    
+    @staticmethod
+    def _fetch_overall_stats(cursor):
+        cursor.execute("""
+            SELECT COUNT(*), SUM(total_questions), SUM(correct_answers), AVG(success_rate)
+            FROM games
+        """)
+        result = cursor.fetchone()
+        
+        if result and result[0] > 0:
+            return {
+                'games': result[0],
+                'total_questions': result[1],
+                'total_correct': result[2],
+                'avg_success': result[3]
+            }
+        return None
+    
+    def get_best_game(self):
+        """
+        Partita con la percentuale di successo più alta (la più recente a parità)
         
+        Returns:
+            tuple (id, timestamp, game_type, mode, total_questions,
+                   correct_answers, success_rate) oppure None
+        """
+        with self._get_connection() as conn:
+            return self._fetch_best_game(conn.cursor())
+    
+    def _fetch_best_game(self, cursor):
+        cursor.execute("""
+            SELECT id, timestamp, game_type, mode, total_questions, 
+                   correct_answers, success_rate
+            FROM games
+            ORDER BY success_rate DESC, timestamp DESC
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
+        return self._game_rows([row])[0] if row else None
+    
+    def get_weekly_stats(self, limit=4):
+        """
+        Partite e media di successo per settimana (a partire dal lunedì)
+        
+        Args:
+            limit: numero di settimane
+        
+        Returns:
+            list di tuple (inizio settimana 'YYYY-MM-DD', partite, media successo)
+            delle ultime limit settimane con almeno una partita, dalla più recente
+        """
+        with self._get_connection() as conn:
+            return self._fetch_weekly_stats(conn.cursor(), limit)
+    
+    def _fetch_weekly_stats(self, cursor, limit):
+        # Raggruppamento sull'espressione di idx_games_week (migrazione 8): l'indice
+        # viene letto all'indietro e la lettura si ferma dopo limit settimane
         if self.use_postgres:
             cursor.execute("""
-                SELECT 
-                    COUNT(*) as games,
-                    AVG(success_rate) as avg_success,
-                    SUM(total_questions) as total_questions
+                SELECT to_char(date_trunc('week', timestamp), 'YYYY-MM-DD'),
+                       COUNT(*), AVG(success_rate)
                 FROM games
-                WHERE game_type LIKE %s
-            """, (f"%{game_type}%",))
+                GROUP BY date_trunc('week', timestamp)
+                ORDER BY date_trunc('week', timestamp) DESC
+                LIMIT %s
+            """, (limit,))
         else:
+            # 'weekday 1' porta al lunedì successivo (o lo stesso giorno se è lunedì)
             cursor.execute("""
-                SELECT 
-                    COUNT(*) as games,
-                    AVG(success_rate) as avg_success,
-                    SUM(total_questions) as total_questions
+                SELECT date(timestamp, 'unixepoch', '-6 days', 'weekday 1') as week,
+                       COUNT(*), AVG(success_rate)
                 FROM games
-                WHERE game_type LIKE ?
-            """, (f"%{game_type}%",))
+                GROUP BY week
+                ORDER BY week DESC
+                LIMIT ?
+            """, (limit,))
         
-        result = cursor.fetchone()
-        conn.close()
+        return cursor.fetchall()
+    
+    def get_play_dates(self):
+        """
+        Giorni distinti in cui è stata giocata almeno una partita
         
-        if result and result[0] > 0:
-            return {
-                'games': result[0],
-                'avg_success': result[1],
-                'total_questions': result[2]
+        Returns:
+            list di date, dalla più recente
+        """
+        with self._get_connection() as conn:
+            return self._fetch_play_dates(conn.cursor())
+    
+    def _fetch_play_dates(self, cursor):
+        if self.use_postgres:
+            cursor.execute("""
+                SELECT DISTINCT timestamp::date as day
+                FROM games
+                ORDER BY day DESC
+            """)
+            return [row[0] for row in cursor.fetchall()]
+        
+        # Divisione intera: giorni dall'epoca, senza passare da stringhe
+        cursor.execute("""
+            SELECT DISTINCT timestamp / 86400 as day
+            FROM games
+            ORDER BY day DESC
+        """)
+        return [EPOCH.date() + timedelta(days=row[0]) for row in cursor.fetchall()]
+    
+    def count_games_since(self, since):
+        """Numero di partite giocate dopo l'istante indicato (datetime)"""
+        with self._get_connection() as conn:
+            return self._count_games_since(conn.cursor(), since)
+    
+    def _count_games_since(self, cursor, since):
+        if self.use_postgres:
+            cursor.execute("SELECT COUNT(*) FROM games WHERE timestamp > %s", (since,))
+        else:
+            cursor.execute("SELECT COUNT(*) FROM games WHERE timestamp > ?", (to_epoch(since),))
+        
+        return cursor.fetchone()[0]
+    
+    def get_dashboard_data(self, since, weeks=4, errors_limit=20):
+        """
+        Legge tutti i dati della dashboard in un'unica transazione di sola lettura
+        
+        Tutte le query vedono lo stesso stato del database, anche se nel
+        frattempo viene salvata una nuova partita.
+        
+        Args:
+            since: inizio del periodo per il conteggio delle partite recenti
+            weeks: numero di settimane del progresso nel tempo
+            errors_limit: numero di parole più sbagliate
+        
+        Returns:
+            dict con overall, best_game, weekly, play_dates, recent_count,
+            categories, common_errors, confused_pairs
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            if self.use_postgres:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            else:
+                # Senza BEGIN esplicito ogni SELECT vedrebbe un'istantanea diversa
+                cursor.execute("BEGIN")
+            
+            data = {
+                'overall': self._fetch_overall_stats(cursor),
+                'best_game': self._fetch_best_game(cursor),
+                'weekly': self._fetch_weekly_stats(cursor, weeks),
+                'play_dates': self._fetch_play_dates(cursor),
+                'recent_count': self._count_games_since(cursor, since),
+                'categories': self._fetch_stats_by_category(cursor),
+                'common_errors': self._fetch_most_common_errors(cursor, errors_limit),
+                'confused_pairs': self._fetch_most_confused_pairs(cursor, errors_limit),
             }
-        return None
+            
+            # Il rilascio della connessione chiude la transazione
+        
+        return data
+    
+    # ==================== STORICO PAGINATO ====================
+    
+    def get_game_history_page(self, cursor=None, page_size=20):
+        """
+        Una pagina dello storico, dalla partita più recente
+        
+        Paginazione per chiave su (timestamp, id): ogni pagina riparte
+        dall'ultima riga della precedente usando l'indice, quindi costa
+        uguale qualunque sia la sua posizione nello storico.
+        
+        Args:
+            cursor: valore next_cursor della pagina precedente (None = prima pagina)
+            page_size: numero di partite per pagina
+        
+        Returns:
+            tuple (righe come get_game_history, next_cursor); next_cursor è
+            None se non ci sono altre pagine
+        """
+        with self._get_connection() as conn:
+            db_cursor = conn.cursor()
+            placeholder = '%s' if self.use_postgres else '?'
+            
+            # Una riga in più per sapere se esiste la pagina successiva
+            if cursor is None:
+                db_cursor.execute(f"""
+                    SELECT id, timestamp, game_type, mode, total_questions, 
+                           correct_answers, success_rate
+                    FROM games
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT {placeholder}
+                """, (page_size + 1,))
+            else:
+                timestamp = cursor[0] if self.use_postgres else to_epoch(cursor[0])
+                db_cursor.execute(f"""
+                    SELECT id, timestamp, game_type, mode, total_questions, 
+                           correct_answers, success_rate
+                    FROM games
+                    WHERE (timestamp, id) < ({placeholder}, {placeholder})
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT {placeholder}
+                """, (timestamp, cursor[1], page_size + 1))
+            
+            rows = self._game_rows(db_cursor.fetchall())
+        
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            return rows, (last[1], last[0])
+        return rows, None
+    
+    def iter_game_history(self, page_size=500):
+        """Scorre tutte le partite, dalla più recente, una pagina alla volta"""
+        cursor = None
+        while True:
+            rows, cursor = self.get_game_history_page(cursor, page_size)
+            yield from rows
+            if cursor is None:
+                return
     
     def get_all_games(self):
         """Ottiene tutte le partite (per Streamlit)"""
-        return self.get_game_history(limit=10000)
\ No newline at end of file
+        return list(self.iter_game_history())
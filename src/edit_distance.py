@@ -0,0 +1,153 @@
+# ==================== src/edit_distance.py ====================
+
+# Distanza di Levenshtein limitata, con l'algoritmo bit-parallelo di
+# Myers (nella formulazione di Hyyrö per la distanza globale), e indice
+# per cercare le parole del vocabolario vicine a una risposta
+
+
+def bounded_levenshtein(pattern, text, max_distance):
+    """
+    Distanza di Levenshtein tra pattern e text, se non supera max_distance
+    
+    Ogni colonna della matrice di programmazione dinamica è codificata in
+    due interi (variazioni +1/-1 verticali), quindi un carattere di text
+    costa poche operazioni sui bit qualunque sia la lunghezza di pattern.
+    Il calcolo si ferma appena la distanza non può più scendere sotto la
+    soglia.
+    
+    Args:
+        pattern (str): Parola di riferimento (es. la risposta corretta)
+        text (str): Parola da confrontare (es. la risposta dell'utente)
+        max_distance (int): Soglia massima di modifiche
+    
+    Returns:
+        int oppure None: la distanza, o None se supera max_distance
+    """
+    m = len(pattern)
+    n = len(text)
+    
+    if abs(m - n) > max_distance:
+        return None
+    if m == 0:
+        return n
+    
+    # Maschera delle posizioni di ogni carattere nel pattern
+    peq = {}
+    bit = 1
+    for char in pattern:
+        peq[char] = peq.get(char, 0) | bit
+        bit <<= 1
+    
+    mask = bit - 1
+    last = 1 << (m - 1)
+    pv = mask  # variazioni verticali +1
+    mv = 0     # variazioni verticali -1
+    score = m
+    remaining = n
+    
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        
+        # Ogni carattere rimasto può abbassare la distanza al massimo di 1
+        remaining -= 1
+        if score - remaining > max_distance:
+            return None
+        
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    
+    return score if score <= max_distance else None
+
+
+def deletions(word, max_deletions):
+    """Insieme delle stringhe ottenute da word cancellando fino a max_deletions caratteri"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_deletions):
+        frontier = {text[:i] + text[i + 1:] for text in frontier for i in range(len(text))}
+        result |= frontier
+    return result
+
+
+class DeletionIndex:
+    """
+    Indice per la ricerca dei vicini entro una distanza di Levenshtein
+    
+    Ogni chiave è registrata sotto tutte le sue cancellazioni fino a
+    max_distance (schema "symmetric delete"): due parole entro distanza k
+    hanno sempre una cancellazione in comune, quindi una ricerca legge
+    solo pochi elementi del dizionario invece di scorrere tutte le chiavi,
+    e misura la distanza esatta solo sui candidati trovati.
+    """
+    
+    __slots__ = ('max_distance', 'keys', 'buckets')
+    
+    def __init__(self, items=(), max_distance=2):
+        """
+        Args:
+            items: coppie (chiave, valore); chiavi uguali condividono i valori
+            max_distance: raggio massimo delle ricerche
+        """
+        self.max_distance = max_distance
+        self.keys = {}     # chiave -> valori
+        self.buckets = {}  # cancellazione -> chiavi che la generano
+        for key, value in items:
+            self.add(key, value)
+    
+    def add(self, key, value):
+        """Aggiunge un valore con la sua chiave"""
+        values = self.keys.get(key)
+        if values is not None:
+            values.append(value)
+            return
+        
+        self.keys[key] = [value]
+        for deletion in deletions(key, self.max_distance):
+            self.buckets.setdefault(deletion, []).append(key)
+    
+    def search(self, key, max_distance):
+        """
+        Chiavi entro max_distance da key
+        
+        Returns:
+            list di tuple (distanza, chiave, valori), dalla più vicina
+        """
+        if max_distance > self.max_distance:
+            raise ValueError(f"Raggio {max_distance} oltre quello dell'indice ({self.max_distance})")
+        
+        candidates = set()
+        for deletion in deletions(key, max_distance):
+            candidates.update(self.buckets.get(deletion, ()))
+        
+        results = []
+        for candidate in candidates:
+            distance = bounded_levenshtein(candidate, key, max_distance)
+            if distance is not None:
+                results.append((distance, candidate, self.keys[candidate]))
+        
+        results.sort(key=lambda result: (result[0], result[1]))
+        return results
+
+
+def levenshtein(a, b):
+    """Distanza di Levenshtein con la matrice classica (riferimento per i benchmark)"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
@@ -1,9 +1,12 @@
 # ==================== src/game_manager.py ====================
 import random
 from .data_loader import DataLoader
-from .database import DatabaseManager
+from .database import get_database_manager
+from .grading import (PARTICIPLE, PRATERITUM, TRANSLATION, grade_answer,
+                      grade_german_in_vocabulary)
 from .review_mode import ReviewMode
 from .statistics import StatisticsManager
+from .write_behind import get_game_writer
 
 
 class GameManager:
@@ -11,7 +14,8 @@ class GameManager:
     
     def __init__(self):
         self.loader = DataLoader()
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
+        self.writer = get_game_writer()
         self.review = ReviewMode()
         self.stats = StatisticsManager()
         self.errors = []
@@ -394,7 +398,7 @@ class GameManager:
                 print(f"{i:2d}. {difficulty_emoji} {word.italian} ({attempts} tentativi)")
         
         # Salva nel database
-        self.db.save_game(
+        self.writer.save_game(
             game_type=f"{game_type} (Studio Approfondito)",
             mode=mode,
             total_questions=total_questions,
@@ -515,8 +519,8 @@ class GameManager:
             try:
                 level = int(input("\nLivello massimo di difficoltà (1-5): ").strip())
                 if 1 <= level <= 5:
-                    filtered_words = self.loader.get_words_by_difficulty(words, 'fixed', level)
-                    print(f"✅ Selezionate {len(filtered_words)} parole con frequenza ≤ {level}")
+                    selected_count = self.loader.count_words_up_to_level(words, level)
+                    print(f"✅ Selezionate {selected_count} parole con frequenza ≤ {level}")
                     return 'fixed', level
                 else:
                     print("❌ Livello deve essere tra 1 e 5.")
@@ -535,9 +539,9 @@ class GameManager:
             try:
                 level = int(input("\nLivello di focus (1-5): ").strip())
                 if 1 <= level <= 5:
-                    filtered_words = self.loader.get_words_by_difficulty(words, 'focus', level)
-                    if filtered_words:
-                        print(f"✅ Selezionate {len(filtered_words)} parole di livello {level}")
+                    selected_count = stats.get(level, 0)
+                    if selected_count:
+                        print(f"✅ Selezionate {selected_count} parole di livello {level}")
                         return 'focus', level
                     else:
                         print(f"❌ Nessuna parola trovata per il livello {level}.")
@@ -548,13 +552,7 @@ class GameManager:
     
     def _load_words(self, game_type):
         """Carica le parole in base al tipo di gioco"""
-        if game_type == 'Nomi':
-            return self.loader.load_nouns()
-        elif game_type == 'Verbi':
-            return self.loader.load_verbs()
-        elif game_type == 'Aggettivi':
-            return self.loader.load_adjectives()
-        return []
+        return self.loader.load_words(game_type)
     
     def _play(self, words, game_type, mode):
         """Gestisce il loop principale del gioco"""
@@ -602,15 +600,16 @@ class GameManager:
         if user_answer.lower() == 'n':
             return 'quit'
         
-        # Usa sempre il sistema di controllo delle parole per gestire umlaut e ß
-        if mode == 'Traduzione Inversa':
-            # Per traduzione inversa, crea una parola temporanea per il controllo
-            from .word import Word
-            temp_word = Word(correct_answer, word.italian)
-            is_correct, penalty, feedback = temp_word.check_answer(user_answer)
+        # Tedesco con umlaut e ß flessibili, italiano con le sole maiuscole
+        # Verso il tedesco la risposta può anche essere un'altra parola del
+        # vocabolario (es. "Zeit" invece di "Tag"): errore completo, salvato con l'errore
+        if mode == TRANSLATION:
+            is_correct, penalty, feedback, confused = grade_german_in_vocabulary(
+                word.forms, user_answer, self.loader.get_vocabularies()
+            )
         else:
-            # Per traduzione normale, usa la parola originale
-            is_correct, penalty, feedback = word.check_answer(user_answer)
+            is_correct, penalty, feedback = grade_answer(word, mode, user_answer)
+            confused = None
         
         print(feedback)
         
@@ -626,7 +625,8 @@ class GameManager:
                 'word_italian': word.italian,
                 'user_answer': user_answer,
                 'correct_answer': correct_answer,
-                'penalty': penalty
+                'penalty': penalty,
+                'confused_with': confused.german if confused else None
             })
             
             return False
@@ -666,9 +666,11 @@ class GameManager:
         if conj_type == 'präteritum':
             print(f"Coniuga '{verb.german}' ({verb.italian}) al Präteritum")
             correct_answer = verb.prateritum
+            form = PRATERITUM
         else:
             print(f"Participio passato di '{verb.german}' ({verb.italian})")
             correct_answer = verb.participio
+            form = PARTICIPLE
         
         user_answer = input("➤ La tua risposta: ").strip()
         
@@ -678,18 +680,19 @@ class GameManager:
         
         self.total_count += 1
         
-        if user_answer == correct_answer:
-            print("✅ CORRETTO!")
+        is_correct, penalty, feedback = grade_answer(verb, form, user_answer)
+        print(feedback)
+        
+        if is_correct:
             self.correct_count += 1
             return True
         else:
-            print(f"❌ SBAGLIATO! Risposta corretta: {correct_answer}")
             self.errors.append({
                 'word_german': verb.german,
                 'word_italian': verb.italian,
                 'user_answer': user_answer,
                 'correct_answer': correct_answer,
-                'penalty': 1.0
+                'penalty': penalty
             })
             return False
     
@@ -721,12 +724,14 @@ class GameManager:
             print("─"*50)
             
             for i, error in enumerate(self.errors, 1):
-                penalty_text = "mezzo errore" if error['penalty'] == 0.5 else "errore completo"
+                penalty_text = ("mezzo errore" if error['penalty'] == 0.5 else
+                                "errore completo" if error['penalty'] == 1.0 else
+                                f"errore parziale, -{error['penalty']}")
                 print(f"{i}. {error['word_italian']} → {error['word_german']}")
                 print(f"   Hai risposto: {error['user_answer']} ({penalty_text})")
         
         # Salva nel database
-        self.db.save_game(
+        self.writer.save_game(
             game_type=game_type,
             mode=mode,
             total_questions=self.total_count,
@@ -0,0 +1,259 @@
+# ==================== src/grading.py ====================
+
+# Valutazione delle risposte: un solo punto per CLI, ripasso e Streamlit,
+# con una variante a blocchi per fogli di risposte, log e prove di carico
+
+from functools import lru_cache
+from .edit_distance import bounded_levenshtein
+from .normalization import ITALIAN_NORMALIZER, AnswerForms, normalize_german_text
+
+
+# Cosa viene chiesto (stessi nomi delle modalità di gioco)
+TRANSLATION = 'Traduzione'                  # italiano → tedesco
+REVERSE_TRANSLATION = 'Traduzione Inversa'  # tedesco → italiano
+ARTICLE = 'Articoli'                        # der/die/das
+PRATERITUM = 'Präteritum'                   # coniugazione: Präteritum
+PARTICIPLE = 'Participio'                   # coniugazione: participio passato
+
+CORRECT = (True, 0, "✅ CORRETTO!")
+
+# Penalità degli errori di battitura, per numero di modifiche (inserimenti,
+# cancellazioni, sostituzioni) rispetto alla risposta corretta normalizzata
+TYPO_PENALTIES = {1: 0.5, 2: 0.75}
+
+
+def max_typos(length):
+    """Modifiche tollerate come errore di battitura per una risposta lunga length"""
+    if length < 4:
+        return 0  # parole corte: una lettera diversa è un'altra parola
+    if length < 8:
+        return 1
+    return 2
+
+
+@lru_cache(maxsize=4096)
+def answer_forms(correct_answer):
+    """
+    Forme canoniche di una risposta tedesca che non appartiene a una Word
+    (coniugazioni, risposte passate come testo da Streamlit)
+    
+    In cache: la stessa forma corretta viene normalizzata una volta sola.
+    """
+    return AnswerForms(correct_answer)
+
+
+# ==================== REGOLE ====================
+
+def grade_german(forms, user_answer):
+    """
+    Valuta una risposta in tedesco
+    
+    Args:
+        forms: AnswerForms della risposta corretta (Word.forms o answer_forms())
+        user_answer: risposta dell'utente
+    
+    Returns:
+        tuple (is_correct, penalty, feedback)
+        - is_correct: bool
+        - penalty: float (0 = corretto, 0.5 = mezzo errore, 1.0 = errore)
+        - feedback: str (messaggio per l'utente)
+    """
+    correct = forms.exact
+    
+    # Rimuovi spazi extra
+    user_answer = user_answer.strip()
+    
+    # Risposta esatta
+    if user_answer == correct:
+        return CORRECT
+    
+    # Usa la normalizzazione per confronti flessibili
+    if forms.matches(user_answer):
+        # Controlla solo le maiuscole se le parole sono equivalenti
+        if user_answer[0].islower() and correct[0].isupper():
+            return False, 0.5, f"⚠️ QUASI! Attenzione alle maiuscole: {correct}"
+        else:
+            return CORRECT
+    
+    # Errore di maiuscola (per sostantivi è grave)
+    if user_answer.lower() == forms.lower:
+        if user_answer[0].islower() and correct[0].isupper():
+            return False, 1.0, f"❌ SBAGLIATO! In tedesco i sostantivi iniziano con la MAIUSCOLA: {correct}"
+        return False, 0.5, f"⚠️ QUASI! Attenzione alle maiuscole: {correct}"
+    
+    # Errore di battitura: confronto tra forme normalizzate, così maiuscole,
+    # umlaut e ß non contano come modifiche
+    typos = typo_count(forms, user_answer)
+    if typos:
+        return False, TYPO_PENALTIES[typos], f"⚠️ QUASI! Errore di battitura: {correct}"
+    
+    # Errore completo
+    return False, 1.0, f"❌ SBAGLIATO! Risposta corretta: {correct}"
+
+
+def typo_count(forms, user_answer):
+    """
+    Numero di modifiche tra risposta e forma corretta, se entro max_typos
+    
+    Returns:
+        int oppure None (troppo diverse, o la parola è troppo corta)
+    """
+    limit = max_typos(len(forms.normalized))
+    if not limit:
+        return None
+    return bounded_levenshtein(forms.normalized, normalize_german_text(user_answer), limit)
+
+
+def find_confusion(forms, user_answer, vocabularies):
+    """
+    Cerca la parola del vocabolario scritta al posto di quella richiesta
+    (es. "Zeit" invece di "Tag"), ammettendo gli stessi errori di battitura
+    tollerati per la risposta corretta
+    
+    Se la risposta è già un errore di battitura della parola corretta,
+    conta solo una parola strettamente più vicina.
+    
+    Args:
+        forms: AnswerForms della risposta corretta
+        user_answer: risposta (sbagliata) dell'utente
+        vocabularies: Vocabulary in cui cercare (DataLoader.get_vocabularies())
+    
+    Returns:
+        Word oppure None
+    """
+    answer = normalize_german_text(user_answer.strip())
+    if not answer:
+        return None
+    
+    # Stessa soglia di typo_count, dalla lunghezza della forma corretta
+    limit = max_typos(len(forms.normalized))
+    distance = typo_count(forms, user_answer)
+    if distance is not None:
+        limit = distance - 1
+    if limit < 0:
+        return None
+    
+    nearest = None
+    for vocabulary in vocabularies:
+        for distance, word in vocabulary.near(answer, limit):
+            if word.forms.normalized == forms.normalized:
+                continue  # stesso lemma (es. un altro significato di 'Grund')
+            if nearest is None or distance < nearest[0]:
+                nearest = (distance, word)
+            break
+    
+    return nearest[1] if nearest else None
+
+
+def confusion_feedback(confused):
+    """Messaggio per una risposta che è un'altra parola del vocabolario"""
+    return f"🔀 Hai scritto '{confused.german}' ({confused.italian}): è un'altra parola del vocabolario"
+
+
+def grade_german_in_vocabulary(forms, user_answer, vocabularies):
+    """
+    Come grade_german, ma una risposta che è un'altra parola del vocabolario
+    (es. "Hund" invece di "Hand") è un errore completo, non di battitura
+    
+    Args:
+        forms: AnswerForms della risposta corretta
+        user_answer: risposta dell'utente
+        vocabularies: Vocabulary in cui cercare (DataLoader.get_vocabularies())
+    
+    Returns:
+        tuple (is_correct, penalty, feedback, confused): confused è la Word
+        scritta al posto di quella richiesta, oppure None
+    """
+    is_correct, penalty, feedback = grade_german(forms, user_answer)
+    if is_correct:
+        return is_correct, penalty, feedback, None
+    
+    confused = find_confusion(forms, user_answer, vocabularies)
+    if confused is None:
+        return is_correct, penalty, feedback, None
+    
+    feedback = f"❌ SBAGLIATO! Risposta corretta: {forms.exact}\n{confusion_feedback(confused)}"
+    return False, 1.0, feedback, confused
+
+
+def grade_italian(correct_answer, user_answer):
+    """Valuta una risposta in italiano: maiuscole o accenti valgono mezzo errore"""
+    user_answer = user_answer.strip()
+    correct = correct_answer.strip()
+    
+    if user_answer == correct:
+        return CORRECT
+    if user_answer.lower() == correct.lower():
+        return False, 0.5, f"⚠️ QUASI! Attenzione alle maiuscole: {correct_answer}"
+    # Accenti mancanti o sbagliati (es. "citta" per "città", tastiere senza lettere accentate)
+    if ITALIAN_NORMALIZER.normalize(user_answer) == ITALIAN_NORMALIZER.normalize(correct):
+        return False, 0.5, f"⚠️ QUASI! Attenzione agli accenti: {correct_answer}"
+    return False, 1.0, f"❌ SBAGLIATO! Risposta corretta: {correct_answer}"
+
+
+def grade_article(correct_article, user_article):
+    """Valuta l'articolo (der/die/das), senza distinzione di maiuscole"""
+    if user_article.strip().lower() == correct_article.strip().lower():
+        return CORRECT
+    return False, 1.0, f"❌ SBAGLIATO! Risposta corretta: {correct_article}"
+
+
+# ==================== PER PAROLA ====================
+
+# modalità -> (attributo con la risposta corretta, funzione di valutazione)
+_GRADERS = {
+    TRANSLATION: ('german', lambda word, answer: grade_german(word.forms, answer)),
+    REVERSE_TRANSLATION: ('italian', lambda word, answer: grade_italian(word.italian, answer)),
+    ARTICLE: ('article', lambda word, answer: grade_article(word.article, answer)),
+    PRATERITUM: ('prateritum', lambda word, answer: grade_german(answer_forms(word.prateritum), answer)),
+    PARTICIPLE: ('participio', lambda word, answer: grade_german(answer_forms(word.participio), answer)),
+}
+
+
+def _grader(mode):
+    try:
+        return _GRADERS[mode]
+    except KeyError:
+        raise ValueError(f"Modalità di valutazione sconosciuta: {mode!r}") from None
+
+
+def correct_answer_for(word, mode):
+    """Risposta corretta attesa per la parola nella modalità indicata"""
+    return getattr(word, _grader(mode)[0])
+
+
+def grade_answer(word, mode, user_answer):
+    """
+    Valuta una risposta
+    
+    Args:
+        word: Word (Noun per ARTICLE, Verb per PRATERITUM/PARTICIPLE)
+        mode: TRANSLATION, REVERSE_TRANSLATION, ARTICLE, PRATERITUM o PARTICIPLE
+        user_answer: risposta dell'utente
+    
+    Returns:
+        tuple (is_correct, penalty, feedback), come grade_german
+    """
+    return _grader(mode)[1](word, user_answer)
+
+
+def grade_batch(answers):
+    """
+    Valuta molte risposte in una volta (fogli importati, log, prove di carico)
+    
+    Args:
+        answers: iterabile di tuple (word, mode, user_answer)
+    
+    Returns:
+        tuple di tre liste parallele (is_correct, penalties, feedbacks)
+    """
+    results = []
+    append = results.append
+    
+    for word, mode, user_answer in answers:
+        append(_grader(mode)[1](word, user_answer))
+    
+    if not results:
+        return [], [], []
+    is_correct, penalties, feedbacks = zip(*results)
+    return list(is_correct), list(penalties), list(feedbacks)
@@ -0,0 +1,439 @@
+# ==================== src/migrations.py ====================
+
+import argparse
+from datetime import datetime
+from .database import (DATABASE_URL, HYBRID_MODE, LOCAL_DB_PATH, USE_POSTGRES,
+                       recompute_word_error_stats, split_game_type)
+from .connection_pool import get_pool
+
+
+# Chiave dell'advisory lock PostgreSQL che serializza le migrazioni tra i worker
+MIGRATION_LOCK_ID = 0x6D696772  # 'migr'
+
+# ==================== MIGRAZIONI ====================
+#
+# Ogni migrazione riceve il cursore e use_postgres. Le prime sono scritte in
+# modo idempotente perché i database creati prima di schema_version hanno già
+# parte dello schema: partono dalla versione 0 e le ripercorrono tutte.
+#
+# Una migrazione rilasciata non cambia più: tabelle, colonne e indici sono
+# scritti al suo interno, mai letti da costanti condivise. Un nuovo indice
+# richiede una nuova migrazione.
+
+def _create_base_tables(cursor, use_postgres):
+    """Tabelle games ed errors"""
+    if use_postgres:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS games (
+                id SERIAL PRIMARY KEY,
+                timestamp TIMESTAMP NOT NULL,
+                game_type VARCHAR(50) NOT NULL,
+                mode VARCHAR(50) NOT NULL,
+                total_questions INTEGER NOT NULL,
+                correct_answers INTEGER NOT NULL,
+                success_rate REAL NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS errors (
+                id SERIAL PRIMARY KEY,
+                game_id INTEGER NOT NULL,
+                word_german VARCHAR(200) NOT NULL,
+                word_italian VARCHAR(200) NOT NULL,
+                user_answer VARCHAR(200) NOT NULL,
+                correct_answer VARCHAR(200) NOT NULL,
+                penalty REAL NOT NULL,
+                FOREIGN KEY (game_id) REFERENCES games(id)
+            )
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                game_type TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                total_questions INTEGER NOT NULL,
+                correct_answers INTEGER NOT NULL,
+                success_rate REAL NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS errors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                game_id INTEGER NOT NULL,
+                word_german TEXT NOT NULL,
+                word_italian TEXT NOT NULL,
+                user_answer TEXT NOT NULL,
+                correct_answer TEXT NOT NULL,
+                penalty REAL NOT NULL,
+                FOREIGN KEY (game_id) REFERENCES games(id)
+            )
+        """)
+
+
+def _sqlite_columns(cursor, table):
+    """Nomi delle colonne di una tabella SQLite"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _add_category_columns(cursor, use_postgres):
+    """Colonne category e session_kind, valorizzate per le partite esistenti"""
+    if use_postgres:
+        cursor.execute("ALTER TABLE games ADD COLUMN IF NOT EXISTS category VARCHAR(50)")
+        cursor.execute("ALTER TABLE games ADD COLUMN IF NOT EXISTS session_kind VARCHAR(50)")
+        placeholder = '%s'
+    else:
+        columns = _sqlite_columns(cursor, 'games')
+        if 'category' not in columns:
+            cursor.execute("ALTER TABLE games ADD COLUMN category TEXT")
+        if 'session_kind' not in columns:
+            cursor.execute("ALTER TABLE games ADD COLUMN session_kind TEXT")
+        placeholder = '?'
+    
+    # I game_type distinti sono pochi: un UPDATE per ciascuno
+    cursor.execute("SELECT DISTINCT game_type FROM games WHERE category IS NULL")
+    
+    for (game_type,) in cursor.fetchall():
+        category, session_kind = split_game_type(game_type)
+        cursor.execute(f"""
+            UPDATE games SET category = {placeholder}, session_kind = {placeholder}
+            WHERE game_type = {placeholder} AND category IS NULL
+        """, (category, session_kind, game_type))
+
+
+def _create_word_error_stats(cursor, use_postgres):
+    """Aggregato word_error_stats, calcolato dagli errori già salvati se è vuoto"""
+    if use_postgres:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS word_error_stats (
+                word_german VARCHAR(200) NOT NULL,
+                word_italian VARCHAR(200) NOT NULL,
+                category VARCHAR(50) NOT NULL,
+                error_count INTEGER NOT NULL,
+                penalty_sum REAL NOT NULL,
+                last_seen TIMESTAMP NOT NULL,
+                PRIMARY KEY (word_german, word_italian, category)
+            )
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS word_error_stats (
+                word_german TEXT NOT NULL,
+                word_italian TEXT NOT NULL,
+                category TEXT NOT NULL,
+                error_count INTEGER NOT NULL,
+                penalty_sum REAL NOT NULL,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (word_german, word_italian, category)
+            )
+        """)
+    
+    cursor.execute("SELECT 1 FROM word_error_stats LIMIT 1")
+    if cursor.fetchone() is None:
+        recompute_word_error_stats(cursor)
+
+
+def _add_sync_columns(cursor, use_postgres):
+    """
+    Identificativo uuid (e, in SQLite, stato di sincronizzazione)
+    
+    Le partite SQLite già salvate ricevono un uuid casuale e risultano da
+    sincronizzare, così in modalità ibrida arriva anche lo storico locale.
+    """
+    if use_postgres:
+        cursor.execute("ALTER TABLE games ADD COLUMN IF NOT EXISTS uuid VARCHAR(36)")
+    else:
+        columns = _sqlite_columns(cursor, 'games')
+        if 'uuid' not in columns:
+            cursor.execute("ALTER TABLE games ADD COLUMN uuid TEXT")
+        if 'synced' not in columns:
+            cursor.execute("ALTER TABLE games ADD COLUMN synced INTEGER NOT NULL DEFAULT 0")
+        
+        cursor.execute("UPDATE games SET uuid = lower(hex(randomblob(16))) WHERE uuid IS NULL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_unsynced ON games (id) WHERE synced = 0")
+    
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_games_uuid ON games (uuid)")
+
+
+def _create_indexes(cursor, use_postgres):
+    """
+    Indici secondari per le query di storico, statistiche e ripasso
+    
+    Stessa sintassi per SQLite e PostgreSQL.
+    """
+    for name, table, columns in (
+        ('idx_errors_game_id', 'errors', 'game_id'),
+        ('idx_errors_word', 'errors', 'word_german, word_italian'),
+        ('idx_games_timestamp_id', 'games', 'timestamp, id'),
+        ('idx_games_game_type', 'games', 'game_type'),
+        ('idx_games_category', 'games', 'category, session_kind'),
+        ('idx_word_error_stats_category', 'word_error_stats', 'category, error_count'),
+    ):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+    
+    # Sostituito da idx_games_timestamp_id (paginazione)
+    cursor.execute("DROP INDEX IF EXISTS idx_games_timestamp")
+
+
+def _epoch_timestamps(cursor, use_postgres):
+    """
+    Timestamp SQLite come secondi interi dall'epoca (vedi database.to_epoch)
+    
+    SQLite non cambia il tipo di una colonna: games e word_error_stats
+    vengono ricreate e ricopiate. strftime('%s') legge l'ISO salvato finora
+    come UTC, la stessa convenzione di to_epoch. PostgreSQL usa già TIMESTAMP.
+    """
+    if use_postgres:
+        return
+    
+    cursor.execute("""
+        CREATE TABLE games_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            game_type TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            total_questions INTEGER NOT NULL,
+            correct_answers INTEGER NOT NULL,
+            success_rate REAL NOT NULL,
+            category TEXT,
+            session_kind TEXT,
+            uuid TEXT,
+            synced INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO games_new (id, timestamp, game_type, mode, total_questions, correct_answers,
+                               success_rate, category, session_kind, uuid, synced)
+        SELECT id, CAST(strftime('%s', timestamp) AS INTEGER), game_type, mode, total_questions,
+               correct_answers, success_rate, category, session_kind, uuid, synced
+        FROM games
+    """)
+    cursor.execute("DROP TABLE games")
+    cursor.execute("ALTER TABLE games_new RENAME TO games")
+    
+    # last_seen è derivato dagli errori: basta ricalcolarlo nella nuova tabella
+    cursor.execute("DROP TABLE word_error_stats")
+    cursor.execute("""
+        CREATE TABLE word_error_stats (
+            word_german TEXT NOT NULL,
+            word_italian TEXT NOT NULL,
+            category TEXT NOT NULL,
+            error_count INTEGER NOT NULL,
+            penalty_sum REAL NOT NULL,
+            last_seen INTEGER NOT NULL,
+            PRIMARY KEY (word_german, word_italian, category)
+        )
+    """)
+    recompute_word_error_stats(cursor)
+    
+    # DROP TABLE ha eliminato anche gli indici delle due tabelle (migrazioni 4 e 5)
+    cursor.execute("CREATE UNIQUE INDEX idx_games_uuid ON games (uuid)")
+    cursor.execute("CREATE INDEX idx_games_unsynced ON games (id) WHERE synced = 0")
+    cursor.execute("CREATE INDEX idx_games_timestamp_id ON games (timestamp, id)")
+    cursor.execute("CREATE INDEX idx_games_game_type ON games (game_type)")
+    cursor.execute("CREATE INDEX idx_games_category ON games (category, session_kind)")
+    cursor.execute("CREATE INDEX idx_word_error_stats_category ON word_error_stats (category, error_count)")
+
+
+def _add_confused_with(cursor, use_postgres):
+    """
+    Colonna errors.confused_with: lemma del vocabolario scritto al posto di
+    quello richiesto (vedi grading.find_confusion), NULL per gli altri errori
+    """
+    if use_postgres:
+        cursor.execute("ALTER TABLE errors ADD COLUMN IF NOT EXISTS confused_with VARCHAR(200)")
+    else:
+        cursor.execute("ALTER TABLE errors ADD COLUMN confused_with TEXT")
+    
+    # Parziale: contiene solo gli errori con una confusione, che sono pochi
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_errors_confused
+        ON errors (word_german, word_italian, confused_with) WHERE confused_with IS NOT NULL
+    """)
+
+
+def _create_week_index(cursor, use_postgres):
+    """
+    Indice sulla settimana delle partite (dal lunedì) per le statistiche
+    settimanali: GROUP BY ... ORDER BY ... DESC LIMIT scorre l'indice
+    all'indietro e si ferma all'ultima settimana richiesta
+    
+    L'espressione deve essere identica a quella di DatabaseManager._fetch_weekly_stats.
+    """
+    if use_postgres:
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_week ON games ((date_trunc('week', timestamp)))")
+    else:
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_games_week
+            ON games (date(timestamp, 'unixepoch', '-6 days', 'weekday 1'))
+        """)
+
+
+def _drop_unsynced_index(cursor, use_postgres):
+    """
+    L'indice delle partite da sincronizzare (migrazioni 4 e 6) serve solo in
+    modalità ibrida: fuori nessuno segna le partite come sincronizzate e
+    l'indice parziale finirebbe per coprire tutta la tabella. Lo crea il
+    SyncEngine all'avvio (vedi DatabaseManager.set_sync_index).
+    """
+    if not use_postgres:
+        cursor.execute("DROP INDEX IF EXISTS idx_games_unsynced")
+
+
+# (versione, descrizione, funzione) in ordine di applicazione.
+# Una migrazione già rilasciata non va mai modificata: si aggiunge la successiva.
+MIGRATIONS = (
+    (1, 'Tabelle games ed errors', _create_base_tables),
+    (2, 'Colonne category e session_kind', _add_category_columns),
+    (3, 'Aggregato word_error_stats', _create_word_error_stats),
+    (4, 'Identificativi uuid e stato di sincronizzazione', _add_sync_columns),
+    (5, 'Indici secondari', _create_indexes),
+    (6, "Timestamp SQLite come secondi dall'epoca", _epoch_timestamps),
+    (7, 'Parola confusa negli errori', _add_confused_with),
+    (8, 'Indice per settimana delle partite', _create_week_index),
+    (9, 'Indice delle partite da sincronizzare solo in modalità ibrida', _drop_unsynced_index),
+)
+
+
+# ==================== ESECUZIONE ====================
+
+class MigrationRunner:
+    """
+    Porta lo schema del database all'ultima versione
+    
+    Le migrazioni mancanti vengono applicate in un'unica transazione sotto
+    lock (BEGIN EXCLUSIVE in SQLite, advisory lock in PostgreSQL): se più
+    worker partono insieme, il primo migra e gli altri trovano lo schema
+    già aggiornato.
+    """
+    
+    def __init__(self, pool, use_postgres, migrations=MIGRATIONS):
+        self.pool = pool
+        self.use_postgres = use_postgres
+        self.migrations = migrations
+    
+    def migrate(self, dry_run=False):
+        """
+        Applica le migrazioni mancanti
+        
+        Args:
+            dry_run: esegue le migrazioni e poi annulla la transazione, per
+                     vedere cosa verrebbe applicato senza modificare nulla
+        
+        Returns:
+            list di tuple (versione, descrizione) delle migrazioni applicate
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            self._lock(cursor)
+            
+            pending = self._pending(cursor)
+            for version, description, migration in pending:
+                migration(cursor, self.use_postgres)
+                self._record(cursor, version, description)
+            
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+        
+        return [(version, description) for version, description, _ in pending]
+    
+    def status(self):
+        """
+        Returns:
+            tuple (versione corrente, list di (versione, descrizione) mancanti)
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            self._lock(cursor)
+            current = self._current_version(cursor)
+            pending = self._pending(cursor)
+        
+        return current, [(version, description) for version, description, _ in pending]
+    
+    def _lock(self, cursor):
+        """Apre la transazione delle migrazioni e ne prende il lock"""
+        if self.use_postgres:
+            # Rilasciato automaticamente a fine transazione
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR(200) NOT NULL,
+                    applied_at TIMESTAMP NOT NULL
+                )
+            """)
+        else:
+            # Gli altri processi attendono (busy_timeout) finché il primo non conferma
+            cursor.execute("BEGIN EXCLUSIVE")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TEXT NOT NULL
+                )
+            """)
+    
+    def _current_version(self, cursor):
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        return cursor.fetchone()[0] or 0
+    
+    def _pending(self, cursor):
+        current = self._current_version(cursor)
+        return [migration for migration in self.migrations if migration[0] > current]
+    
+    def _record(self, cursor, version, description):
+        if self.use_postgres:
+            cursor.execute("""
+                INSERT INTO schema_version (version, description, applied_at)
+                VALUES (%s, %s, NOW())
+            """, (version, description))
+        else:
+            cursor.execute("""
+                INSERT INTO schema_version (version, description, applied_at)
+                VALUES (?, ?, ?)
+            """, (version, description, datetime.now().isoformat()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migrazioni e manutenzione dello schema del database")
+    parser.add_argument('command', choices=['status', 'migrate', 'rebuild-word-stats'],
+                        nargs='?', default='status',
+                        help="status: versione corrente e migrazioni mancanti; "
+                             "migrate: applica le migrazioni mancanti; "
+                             "rebuild-word-stats: ricalcola word_error_stats dagli errori")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="esegue le migrazioni in una transazione poi annullata")
+    args = parser.parse_args()
+    
+    # Pool diretto: creare un DatabaseManager applicherebbe subito le migrazioni
+    if USE_POSTGRES and not HYBRID_MODE:
+        runner = MigrationRunner(get_pool(database_url=DATABASE_URL), use_postgres=True)
+    else:
+        runner = MigrationRunner(get_pool(db_path=LOCAL_DB_PATH), use_postgres=False)
+    
+    if args.command == 'rebuild-word-stats':
+        # Il DatabaseManager condiviso applica prima le eventuali migrazioni mancanti
+        from .database import get_database_manager
+        
+        rows = get_database_manager().rebuild_word_error_stats()
+        print(f"✅ word_error_stats ricalcolata: {rows} righe")
+    elif args.command == 'status':
+        current, pending = runner.status()
+        print(f"📦 Versione dello schema: {current}")
+        for version, description in pending:
+            print(f"   ⏳ {version}: {description}")
+        if not pending:
+            print("   ✅ Nessuna migrazione da applicare")
+    else:
+        applied = runner.migrate(dry_run=args.dry_run)
+        prefix = "🔍 Verrebbe applicata" if args.dry_run else "✅ Applicata"
+        for version, description in applied:
+            print(f"   {prefix} {version}: {description}")
+        if not applied:
+            print("   ✅ Schema già aggiornato")
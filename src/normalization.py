@@ -1,18 +1,157 @@
 # ==================== src/normalization.py ====================
 
+import re
+import unicodedata
+
+
+# Regole di normalizzazione del tedesco: (da, a), applicate dopo il lowercase.
+# normalize_german_text le ripete in linea: vanno tenute allineate.
+GERMAN_RULES = (
+    ('ae', 'ä'),
+    ('oe', 'ö'),
+    ('ue', 'ü'),
+    ('ss', 'ß'),
+)
+
+
+def _accent_table():
+    """Tabella per str.translate: lettera accentata -> lettera base (Latin-1 ed Extended-A)"""
+    table = {}
+    for code in range(0xC0, 0x180):
+        base = unicodedata.normalize('NFD', chr(code))[0]
+        if base != chr(code) and base.isascii():
+            table[code] = base
+    return table
+
+
+class Normalizer:
+    """
+    Regole di normalizzazione dichiarate una volta e compilate
+    
+    - Le regole di un solo carattere e la rimozione degli accenti diventano
+      un'unica tabella per str.translate.
+    - Le regole di più caratteri diventano una regex ad alternativa unica
+      (una sola passata, la più lunga vince). Se però le regole non possono
+      interferire tra loro, una catena di str.replace dà lo stesso risultato
+      e in CPython è più veloce: il compilatore sceglie quella.
+    
+    Il risultato della compilazione è la funzione normalize, una closure
+    sulle regole già preparate: è lei il percorso caldo, senza accessi ad
+    attributi.
+    
+    Esempio:
+        Normalizer(GERMAN_RULES).normalize('Strasse') -> 'straße'
+    """
+    
+    def __init__(self, rules=(), lowercase=True, strip_accents=False, strategy=None):
+        """
+        Args:
+            rules: coppie (da, a) da sostituire, nell'ordine di priorità;
+                   quelle di un solo carattere si applicano per prime
+            lowercase: converte in minuscolo prima delle sostituzioni
+            strip_accents: toglie gli accenti (es. risposte in italiano: 'città' -> 'citta')
+            strategy: 'replace' o 'regex' per forzare la strategia (default: automatica)
+        """
+        self.rules = tuple(rules)
+        self.lowercase = lowercase
+        self.strip_accents = strip_accents
+        
+        table = _accent_table() if strip_accents else {}
+        multi = []
+        for source, target in self.rules:
+            if len(source) == 1:
+                table[ord(source)] = target
+            else:
+                multi.append((source, target))
+        
+        if strategy is None:
+            strategy = 'replace' if self._independent(multi) else 'regex'
+        self.strategy = strategy if multi else 'replace'
+        self.normalize = self._compile(table or None, tuple(multi))
+    
+    def __call__(self, text):
+        return self.normalize(text)
+    
+    def _compile(self, table, replacements):
+        """Costruisce la funzione di normalizzazione per la strategia scelta"""
+        lowercase = self.lowercase
+        # Se la tabella tocca solo caratteri non ASCII, il testo ASCII la salta
+        ascii_skip = table is not None and all(code > 0x7F for code in table)
+        
+        if self.strategy == 'regex':
+            # Alternative più lunghe prima: a parità di posizione vince la regola più specifica
+            targets = dict(replacements)
+            pattern = re.compile('|'.join(
+                re.escape(source) for source in sorted(targets, key=len, reverse=True)
+            ))
+            substitute = pattern.sub
+            
+            def target_of(match):
+                return targets[match.group()]
+            
+            def normalize(text):
+                if not text:
+                    return text
+                if lowercase:
+                    text = text.lower()
+                text = text.strip()
+                if table is not None and not (ascii_skip and text.isascii()):
+                    text = text.translate(table)
+                return substitute(target_of, text)
+            
+            return normalize
+        
+        # Catena di str.replace: le regole sono indipendenti, l'ordine non conta
+        def normalize(text):
+            if not text:
+                return text
+            if lowercase:
+                text = text.lower()
+            text = text.strip()
+            if table is not None and not (ascii_skip and text.isascii()):
+                text = text.translate(table)
+            for source, target in replacements:
+                text = text.replace(source, target)
+            return text
+        
+        return normalize
+    
+    @staticmethod
+    def _independent(rules):
+        """
+        True se applicare le regole in sequenza equivale a una sola passata
+        
+        Vale quando nessuna regola contiene un'altra o si sovrappone all'inizio
+        di un'altra, e nessun risultato contiene caratteri delle regole.
+        """
+        sources = [source for source, _ in rules]
+        rule_chars = set(''.join(sources))
+        
+        for source, target in rules:
+            if rule_chars & set(target):
+                return False
+            for other in sources:
+                if other != source and other in source:
+                    return False
+                if other != source and any(source.endswith(other[:i]) for i in range(1, len(other))):
+                    return False
+        return True
+
+
+# Normalizzatori predefiniti
+GERMAN_NORMALIZER = Normalizer(GERMAN_RULES)
+ITALIAN_NORMALIZER = Normalizer(strip_accents=True)
+
+
 def normalize_german_text(text):
     """
     Normalizza il testo tedesco per confronti più flessibili
     
-    Converte:
-    - ae → ä
-    - oe → ö  
-    - ue → ü
-    - ss → ß
-    - AE → Ä
-    - OE → Ö
-    - UE → Ü
-    - SS → ß
+    Stesso risultato di GERMAN_NORMALIZER.normalize: minuscolo, spazi esterni
+    rimossi, poi ae → ä, oe → ö, ue → ü, ss → ß (quindi anche AE → ä, SS → ß).
+    È il percorso più caldo della valutazione, per cui le GERMAN_RULES sono
+    scritte qui una per una: la catena diretta di replace evita il ciclo
+    sulle regole della funzione compilata (vedi benchmarks/normalization.py).
     
     Args:
         text (str): Testo da normalizzare
@@ -22,19 +161,7 @@ def normalize_german_text(text):
     """
     if not text:
         return text
-    
-    # Converti in lowercase per normalizzazione
-    normalized = text.lower().strip()
-    
-    # Sostituzioni per umlaut
-    normalized = normalized.replace('ae', 'ä')
-    normalized = normalized.replace('oe', 'ö')
-    normalized = normalized.replace('ue', 'ü')
-    
-    # Sostituzione per ß
-    normalized = normalized.replace('ss', 'ß')
-    
-    return normalized
+    return text.lower().strip().replace('ae', 'ä').replace('oe', 'ö').replace('ue', 'ü').replace('ss', 'ß')
 
 
 def normalize_for_comparison(text):
@@ -88,3 +215,37 @@ def compare_german_words(user_answer, correct_answer):
                 return True
     
     return False
+
+
+class AnswerForms:
+    """
+    Forme canoniche di una risposta corretta, calcolate una volta sola
+    
+    Le parole del vocabolario le costruiscono al caricamento (e finiscono
+    nello snapshot): per ogni risposta resta da normalizzare solo l'input
+    dell'utente, confrontato con le varianti tramite appartenenza al set.
+    """
+    
+    __slots__ = ('exact', 'lower', 'normalized', 'variants')
+    
+    def __init__(self, correct_answer):
+        self.exact = correct_answer
+        self.lower = correct_answer.lower()
+        self.normalized = normalize_german_text(correct_answer)
+        self.variants = frozenset(normalize_for_comparison(correct_answer))
+    
+    def matches(self, user_answer):
+        """
+        Stesso risultato di compare_german_words(user_answer, self.exact)
+        
+        Args:
+            user_answer (str): Risposta dell'utente
+            
+        Returns:
+            bool: True se la risposta è equivalente a quella corretta
+        """
+        if not user_answer or not self.exact:
+            return user_answer == self.exact
+        
+        return (user_answer.strip() in self.variants
+                or normalize_german_text(user_answer) in self.variants)
@@ -1,15 +1,21 @@
 # ==================== src/review_mode.py ====================
 
 import random
-from .database import DatabaseManager
+from .database import get_database_manager
 from .data_loader import DataLoader
+from .grading import (PARTICIPLE, PRATERITUM, TRANSLATION, grade_answer,
+                      grade_german_in_vocabulary)
+from .statistics import StatisticsManager
+from .write_behind import get_game_writer
 
 
 class ReviewMode:
     """Modalità di ripasso basata sugli errori più frequenti"""
     
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
+        self.writer = get_game_writer()
+        self.stats = StatisticsManager()
         self.loader = DataLoader()
         self.errors = []
         self.correct_count = 0
@@ -27,33 +33,31 @@ class ReviewMode:
         Returns:
             list di oggetti Word (Noun/Verb/Adjective)
         """
-        # Ottieni le parole più sbagliate dal database
-        error_words = self.db.get_most_common_errors_by_type(game_type, min_errors)
+        # Ottieni le parole più sbagliate (dalla cache finché non si salva una partita)
+        error_words = self.stats.get_difficult_words(game_type, min_errors)
         
         if not error_words:
             return None
         
-        # Carica tutte le parole del tipo richiesto
-        if game_type == 'Nomi':
-            all_words = self.loader.load_nouns()
-        elif game_type == 'Verbi':
-            all_words = self.loader.load_verbs()
-        else:
-            all_words = self.loader.load_adjectives()
+        vocabulary = self.loader.get_vocabulary(game_type)
+        if vocabulary is None:
+            return None
         
-        # Filtra solo le parole con errori
+        # Le righe arrivano già ordinate per numero di errori (più errori = priorità):
+        # ogni riga diventa un lookup diretto negli indici del vocabolario
         words_to_review = []
-        error_dict = {word[0]: word[2] for word in error_words}  # {german: error_count}
+        seen = set()
         
-        for word in all_words:
-            word_german = word.german if hasattr(word, 'german') else word.verb if hasattr(word, 'verb') else word.adjective
-            if word_german in error_dict:
-                words_to_review.append(word)
-        
-        # Limita il numero e ordina per numero di errori (più errori = priorità)
-        words_to_review = words_to_review[:limit]
+        for word_german, word_italian, error_count in error_words:
+            for word in vocabulary.find(word_german, word_italian):
+                if id(word) not in seen:
+                    seen.add(id(word))
+                    words_to_review.append(word)
+            
+            if len(words_to_review) >= limit:
+                break
         
-        return words_to_review
+        return words_to_review[:limit]
     
     def start_review(self, game_type, mode='Traduzione'):
         """Avvia una sessione di ripasso"""
@@ -66,7 +70,7 @@ class ReviewMode:
         
         if not words:
             # Controlla se ci sono errori ma con soglia più alta
-            error_words = self.db.get_most_common_errors_by_type(game_type, min_errors=2)
+            error_words = self.stats.get_difficult_words(game_type, min_errors=2)
             if error_words:
                 print("\n📊 Hai errori nel database, ma nessuna parola è stata sbagliata abbastanza volte.")
                 print("   (Soglia attuale: almeno 2 errori per parola)")
@@ -122,26 +126,22 @@ class ReviewMode:
             return 'quit'
         
         # Usa il sistema di punteggio corretto
-        if user_answer.strip() == correct_answer.strip():
-            print("✅ CORRETTO!")
+        # Verso il tedesco la risposta può anche essere un'altra parola del
+        # vocabolario (es. "Zeit" invece di "Tag"): errore completo, salvato con l'errore
+        if mode == TRANSLATION:
+            is_correct, penalty, feedback, confused = grade_german_in_vocabulary(
+                word.forms, user_answer, self.loader.get_vocabularies()
+            )
+        else:
+            is_correct, penalty, feedback = grade_answer(word, mode, user_answer)
+            confused = None
+        print(feedback)
+        
+        if is_correct:
             self.total_count += 1
             self.correct_count += 1
             return True
         else:
-            # Controlla errori di maiuscola per traduzione inversa
-            if mode == 'Traduzione Inversa':
-                if user_answer.strip().lower() == correct_answer.strip().lower():
-                    print(f"⚠️ QUASI! Attenzione alle maiuscole: {correct_answer}")
-                    penalty = 0.5
-                else:
-                    print(f"❌ SBAGLIATO! Risposta corretta: {correct_answer}")
-                    penalty = 1.0
-            else:
-                # Logica originale per traduzione normale
-                correct_word = word.german if hasattr(word, 'german') else word.verb if hasattr(word, 'verb') else word.adjective
-                is_correct, penalty, feedback = word.check_answer(user_answer)
-                print(feedback)
-            
             self.total_count += 1
             
             self.errors.append({
@@ -149,7 +149,8 @@ class ReviewMode:
                 'word_italian': word.italian,
                 'user_answer': user_answer,
                 'correct_answer': correct_answer,
-                'penalty': penalty
+                'penalty': penalty,
+                'confused_with': confused.german if confused else None
             })
             
             return False
@@ -189,9 +190,11 @@ class ReviewMode:
         if conj_type == 'präteritum':
             print(f"Coniuga '{verb.german}' ({verb.italian}) al Präteritum")
             correct_answer = verb.prateritum
+            form = PRATERITUM
         else:
             print(f"Participio passato di '{verb.german}' ({verb.italian})")
             correct_answer = verb.participio
+            form = PARTICIPLE
         
         user_answer = input("➤ La tua risposta: ").strip()
         
@@ -201,18 +204,19 @@ class ReviewMode:
         
         self.total_count += 1
         
-        if user_answer == correct_answer:
-            print("✅ CORRETTO!")
+        is_correct, penalty, feedback = grade_answer(verb, form, user_answer)
+        print(feedback)
+        
+        if is_correct:
             self.correct_count += 1
             return True
         else:
-            print(f"❌ SBAGLIATO! Risposta corretta: {correct_answer}")
             self.errors.append({
                 'word_german': verb.german,
                 'word_italian': verb.italian,
                 'user_answer': user_answer,
                 'correct_answer': correct_answer,
-                'penalty': 1.0
+                'penalty': penalty
             })
             return False
     
@@ -243,12 +247,14 @@ class ReviewMode:
             print("─"*50)
             
             for i, error in enumerate(self.errors, 1):
-                penalty_text = "mezzo errore" if error['penalty'] == 0.5 else "errore completo"
+                penalty_text = ("mezzo errore" if error['penalty'] == 0.5 else
+                                "errore completo" if error['penalty'] == 1.0 else
+                                f"errore parziale, -{error['penalty']}")
                 print(f"{i}. {error['word_italian']} → {error['word_german']}")
                 print(f"   Hai risposto: {error['user_answer']} ({penalty_text})")
         
         # Salva nel database
-        self.db.save_game(
+        self.writer.save_game(
             game_type=f"{game_type} (Ripasso)",
             mode=mode,
             total_questions=self.total_count,
@@ -1,114 +1,273 @@
 # ==================== src/statistics.py ====================
 
-from .database import DatabaseManager
+import os
+import threading
+import time
+from collections import OrderedDict
+from .database import get_database_manager
 from datetime import datetime, timedelta
-from collections import defaultdict
+
+
+# Secondi di validità di un risultato in cache (0 = finché non si salva una partita).
+# Con PostgreSQL è il ritardo massimo con cui compaiono le partite salvate da
+# altri processi (es. più worker): la generazione conta solo quelle di questo.
+STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL') or 60)
+
+# Numero massimo di risultati tenuti in cache
+STATS_CACHE_MAX_ENTRIES = int(os.getenv('STATS_CACHE_MAX_ENTRIES') or 32)
+
+
+class StatsCache:
+    """
+    Cache LRU dei risultati delle statistiche
+    
+    Ogni risultato ricorda la generazione del database (DatabaseManager.generation)
+    da cui è stato calcolato: dopo un save_game di questo processo, o di un
+    altro processo sullo stesso file SQLite (CLI e Streamlit), la generazione
+    cambia e il risultato viene ricalcolato alla prossima richiesta. Le
+    partite salvate da altri processi su PostgreSQL compaiono invece alla
+    scadenza del risultato (STATS_CACHE_TTL).
+    """
+    
+    def __init__(self, max_entries=STATS_CACHE_MAX_ENTRIES, ttl=STATS_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # chiave -> (generazione, istante, valore)
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, generation, compute):
+        """
+        Restituisce il valore in cache per key, calcolandolo con compute() se
+        manca, è di una generazione precedente o è scaduto
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation and not self._expired(entry):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        
+        # Calcolato fuori dal lock: se nel frattempo arriva un save_game il
+        # valore resta associato alla generazione vecchia e verrà ricalcolato
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return value
+    
+    def _expired(self, entry):
+        return self.ttl > 0 and time.monotonic() - entry[1] >= self.ttl
+    
+    def clear(self):
+        """Svuota la cache"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache condivisa da tutti gli StatisticsManager del processo
+_stats_cache = StatsCache()
+
+
+def clear_stats_cache():
+    """Svuota la cache delle statistiche (il prossimo accesso rilegge il database)"""
+    _stats_cache.clear()
+
+
+def compute_streaks(dates, today=None):
+    """
+    Calcola la streak corrente e la migliore (giorni consecutivi di gioco)
+    
+    Args:
+        dates: date distinte in cui si è giocato, dalla più recente
+        today: data di riferimento (default: oggi)
+    
+    Returns:
+        tuple (streak corrente, miglior streak)
+    """
+    current_streak = 0
+    if dates:
+        today = today or datetime.now().date()
+        if dates[0] == today or dates[0] == today - timedelta(days=1):
+            current_streak = 1
+            for i in range(len(dates) - 1):
+                if (dates[i] - dates[i+1]).days == 1:
+                    current_streak += 1
+                else:
+                    break
+    
+    # Trova la longest streak
+    longest_streak = 1
+    temp_streak = 1
+    for i in range(len(dates) - 1):
+        if (dates[i] - dates[i+1]).days == 1:
+            temp_streak += 1
+            longest_streak = max(longest_streak, temp_streak)
+        else:
+            temp_streak = 1
+    
+    return current_streak, longest_streak
+
+
+class DashboardSnapshot:
+    """
+    Dati della dashboard letti in un'unica transazione
+    
+    CLI, esportazione e pagine Streamlit disegnano tutti da questo oggetto,
+    quindi ogni visualizzazione costa un numero fisso di query.
+    """
+    
+    # Categorie mostrate nell'analisi per categoria
+    CATEGORIES = ('Nomi', 'Verbi', 'Aggettivi')
+    
+    def __init__(self, db, weeks=4, errors_limit=20):
+        self.taken_at = datetime.now()
+        data = db.get_dashboard_data(
+            since=self.taken_at - timedelta(days=7),
+            weeks=weeks,
+            errors_limit=errors_limit
+        )
+        
+        self.overall = data['overall']
+        self.best_game = data['best_game']
+        self.weekly = data['weekly']
+        self.play_dates = data['play_dates']
+        self.games_last_week = data['recent_count']
+        self.common_errors = data['common_errors']
+        self.confused_pairs = data['confused_pairs']
+        self.category_stats = {
+            category: data['categories'][category]
+            for category in self.CATEGORIES
+            if category in data['categories']
+        }
+        self.current_streak, self.longest_streak = compute_streaks(
+            self.play_dates, today=self.taken_at.date()
+        )
+    
+    @property
+    def has_games(self):
+        """True se è stata giocata almeno una partita"""
+        return self.overall is not None
 
 
 class StatisticsManager:
     """Gestisce statistiche avanzate sull'apprendimento"""
     
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
+    
+    def _cached(self, category, name, params, compute):
+        """Legge un risultato dalla cache, chiave (database, categoria, nome, parametri)"""
+        key = (self.db.database_key, category, name, params)
+        return _stats_cache.get_or_compute(key, self.db.generation, compute)
+    
+    def get_snapshot(self, weeks=4, errors_limit=20):
+        """
+        Dati della dashboard (vedi DashboardSnapshot), dalla cache se nessuna
+        partita è stata salvata nel frattempo
+        """
+        # La data fa parte della chiave: streak e partite recenti dipendono dal giorno
+        params = (datetime.now().date(), weeks, errors_limit)
+        return self._cached(None, 'dashboard', params, lambda: DashboardSnapshot(
+            self.db, weeks=weeks, errors_limit=errors_limit
+        ))
+    
+    def get_history_page(self, cursor=None, page_size=20):
+        """Una pagina dello storico partite (vedi DatabaseManager.get_game_history_page), dalla cache"""
+        return self._cached(None, 'history_page', (cursor, page_size),
+                            lambda: self.db.get_game_history_page(cursor, page_size))
+    
+    def get_difficult_words(self, category, min_errors=2):
+        """Parole più sbagliate di una categoria, dalla cache"""
+        return self._cached(category, 'difficult_words', (min_errors,),
+                            lambda: self.db.get_most_common_errors_by_type(category, min_errors))
     
     def show_dashboard(self):
         """Mostra una dashboard completa delle statistiche"""
+        snapshot = self.get_snapshot()
+        
         print("\n" + "="*60)
         print("📊 DASHBOARD STATISTICHE DETTAGLIATE")
         print("="*60)
         
         # Statistiche generali
-        self._show_general_stats()
+        self._show_general_stats(snapshot)
         
         # Progressi nel tempo
-        self._show_progress_over_time()
+        self._show_progress_over_time(snapshot)
         
         # Analisi per categoria
-        self._show_category_breakdown()
+        self._show_category_breakdown(snapshot)
         
         # Parole più difficili
-        self._show_difficult_words()
+        self._show_difficult_words(snapshot)
+        
+        # Parole scambiate con altre del vocabolario
+        self._show_confused_pairs(snapshot)
         
         # Streak e record
-        self._show_streaks()
+        self._show_streaks(snapshot)
         
         print("="*60)
     
-    def _show_general_stats(self):
+    def _show_general_stats(self, snapshot):
         """Statistiche generali"""
         print("\n🎯 STATISTICHE GENERALI")
         print("─"*60)
         
-        games = self.db.get_game_history(limit=1000)
+        stats = snapshot.overall
         
-        if not games:
+        if not stats:
             print("   Nessuna partita giocata ancora.")
             return
         
-        total_games = len(games)
-        total_questions = sum(game[4] for game in games)
-        total_correct = sum(game[5] for game in games)
-        avg_success = sum(game[6] for game in games) / total_games
-        
-        print(f"   📈 Partite giocate: {total_games}")
-        print(f"   ❓ Domande totali: {total_questions}")
-        print(f"   ✅ Risposte corrette: {total_correct}")
-        print(f"   📊 Media successo: {avg_success:.1f}%")
+        print(f"   📈 Partite giocate: {stats['games']}")
+        print(f"   ❓ Domande totali: {stats['total_questions']}")
+        print(f"   ✅ Risposte corrette: {stats['total_correct']}")
+        print(f"   📊 Media successo: {stats['avg_success']:.1f}%")
         
         # Trova la migliore partita
-        best_game = max(games, key=lambda x: x[6])
+        best_game = snapshot.best_game
         print(f"\n   🏆 Miglior partita: {best_game[6]:.1f}% ({best_game[2]} - {best_game[3]})")
     
-    def _show_progress_over_time(self):
+    def _show_progress_over_time(self, snapshot):
         """Mostra il progresso nel tempo"""
         print("\n📈 PROGRESSO NEL TEMPO")
         print("─"*60)
         
-        games = self.db.get_game_history(limit=1000)
+        # Raggruppa per settimana, ultime 4 settimane
+        weekly_stats = snapshot.weekly
         
-        if not games:
+        if not weekly_stats:
             return
         
-        # Raggruppa per settimana
-        weekly_stats = defaultdict(lambda: {'games': 0, 'total_success': 0})
-        
-        for game in games:
-            # Parse timestamp
-            timestamp = datetime.fromisoformat(game[1])
-            week_start = timestamp - timedelta(days=timestamp.weekday())
-            week_key = week_start.strftime("%Y-%m-%d")
-            
-            weekly_stats[week_key]['games'] += 1
-            weekly_stats[week_key]['total_success'] += game[6]
-        
-        # Mostra ultime 4 settimane
-        sorted_weeks = sorted(weekly_stats.items(), reverse=True)[:4]
-        
         print("   Ultime 4 settimane:")
-        for week, stats in sorted_weeks:
-            avg = stats['total_success'] / stats['games']
-            print(f"   • Settimana del {week}: {stats['games']} partite, media {avg:.1f}%")
+        for week, games, avg in weekly_stats:
+            print(f"   • Settimana del {week}: {games} partite, media {avg:.1f}%")
     
-    def _show_category_breakdown(self):
+    def _show_category_breakdown(self, snapshot):
         """Analisi per categoria"""
         print("\n📚 ANALISI PER CATEGORIA")
         print("─"*60)
         
-        for game_type in ['Nomi', 'Verbi', 'Aggettivi']:
-            stats = self.db.get_stats_by_type(game_type)
-            
-            if stats:
-                print(f"\n   {game_type}:")
-                print(f"      • Partite: {stats['games']}")
-                print(f"      • Media successo: {stats['avg_success']:.1f}%")
-                print(f"      • Parole studiate: {stats['total_questions']}")
+        for game_type, stats in snapshot.category_stats.items():
+            print(f"\n   {game_type}:")
+            print(f"      • Partite: {stats['games']}")
+            print(f"      • Media successo: {stats['avg_success']:.1f}%")
+            print(f"      • Parole studiate: {stats['total_questions']}")
     
-    def _show_difficult_words(self):
+    def _show_difficult_words(self, snapshot):
         """Mostra le parole più difficili"""
         print("\n❌ PAROLE PIÙ DIFFICILI")
         print("─"*60)
         
-        errors = self.db.get_most_common_errors(limit=10)
+        errors = snapshot.common_errors[:10]
         
         if errors:
             print("   Top 10 parole più sbagliate:")
@@ -117,76 +276,69 @@ class StatisticsManager:
         else:
             print("   Nessun errore registrato!")
     
-    def _show_streaks(self):
+    def _show_confused_pairs(self, snapshot):
+        """Mostra le coppie di parole confuse più spesso"""
+        pairs = snapshot.confused_pairs[:10]
+        if not pairs:
+            return
+        
+        print("\n🔀 PAROLE CONFUSE")
+        print("─"*60)
+        print("   Parola richiesta → parola scritta al suo posto:")
+        for i, (german, italian, confused_with, count) in enumerate(pairs, 1):
+            print(f"   {i:2d}. {german} ({italian}) → {confused_with} - {count} volte")
+    
+    def _show_streaks(self, snapshot):
         """Mostra streak e record"""
         print("\n🔥 STREAK E RECORD")
         print("─"*60)
         
-        games = self.db.get_game_history(limit=1000)
-        
-        if not games:
+        # Streak calcolate sui giorni distinti di gioco
+        if not snapshot.play_dates:
             return
         
-        # Calcola streak corrente (giorni consecutivi di gioco)
-        dates = [datetime.fromisoformat(game[1]).date() for game in games]
-        dates = sorted(set(dates), reverse=True)
-        
-        current_streak = 0
-        if dates:
-            today = datetime.now().date()
-            if dates[0] == today or dates[0] == today - timedelta(days=1):
-                current_streak = 1
-                for i in range(len(dates) - 1):
-                    if (dates[i] - dates[i+1]).days == 1:
-                        current_streak += 1
-                    else:
-                        break
-        
-        # Trova la longest streak
-        longest_streak = 1
-        temp_streak = 1
-        for i in range(len(dates) - 1):
-            if (dates[i] - dates[i+1]).days == 1:
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                temp_streak = 1
-        
-        print(f"   🔥 Streak corrente: {current_streak} giorni")
-        print(f"   🏅 Miglior streak: {longest_streak} giorni")
+        print(f"   🔥 Streak corrente: {snapshot.current_streak} giorni")
+        print(f"   🏅 Miglior streak: {snapshot.longest_streak} giorni")
         
         # Partite questa settimana
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_games = [g for g in games if datetime.fromisoformat(g[1]) > week_ago]
-        print(f"   📅 Partite questa settimana: {len(recent_games)}")
+        print(f"   📅 Partite questa settimana: {snapshot.games_last_week}")
     
-    def export_statistics(self, filename='stats_export.txt'):
-        """Esporta statistiche in un file di testo"""
+    def export_statistics(self, filename='stats_export.txt', snapshot=None):
+        """
+        Esporta statistiche in un file di testo
+        
+        Args:
+            filename: file di destinazione
+            snapshot: DashboardSnapshot già letto (se None viene letto ora)
+        """
+        snapshot = snapshot or self.get_snapshot()
+        
         with open(filename, 'w', encoding='utf-8') as f:
             f.write("="*60 + "\n")
             f.write("STATISTICHE APPRENDIMENTO TEDESCO\n")
-            f.write(f"Generato il: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+            f.write(f"Generato il: {snapshot.taken_at.strftime('%Y-%m-%d %H:%M')}\n")
             f.write("="*60 + "\n\n")
             
             # Statistiche generali
-            games = self.db.get_game_history(limit=1000)
+            stats = snapshot.overall
             
-            if games:
-                total_games = len(games)
-                total_questions = sum(game[4] for game in games)
-                total_correct = sum(game[5] for game in games)
-                avg_success = sum(game[6] for game in games) / total_games
-                
+            if stats:
                 f.write("STATISTICHE GENERALI\n")
-                f.write(f"Partite giocate: {total_games}\n")
-                f.write(f"Domande totali: {total_questions}\n")
-                f.write(f"Risposte corrette: {total_correct}\n")
-                f.write(f"Media successo: {avg_success:.1f}%\n\n")
+                f.write(f"Partite giocate: {stats['games']}\n")
+                f.write(f"Domande totali: {stats['total_questions']}\n")
+                f.write(f"Risposte corrette: {stats['total_correct']}\n")
+                f.write(f"Media successo: {stats['avg_success']:.1f}%\n\n")
                 
                 # Parole più difficili
                 f.write("PAROLE PIÙ DIFFICILI\n")
-                errors = self.db.get_most_common_errors(limit=20)
+                errors = snapshot.common_errors[:20]
                 for i, (german, italian, count) in enumerate(errors, 1):
                     f.write(f"{i}. {german} ({italian}) - {count} errori\n")
+                
+                # Parole confuse
+                if snapshot.confused_pairs:
+                    f.write("\nPAROLE CONFUSE\n")
+                    for i, (german, italian, confused_with, count) in enumerate(snapshot.confused_pairs, 1):
+                        f.write(f"{i}. {german} ({italian}) → {confused_with} - {count} volte\n")
         
-        print(f"\n✅ Statistiche esportate in '{filename}'")
\ No newline at end of file
+        print(f"\n✅ Statistiche esportate in '{filename}'")
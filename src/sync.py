@@ -0,0 +1,228 @@
+# ==================== src/sync.py ====================
+
+import atexit
+import os
+import threading
+import time
+from .database import DATA_ERRORS, DATABASE_URL, DatabaseManager, get_database_manager
+
+
+# Partite inviate al database remoto in ogni transazione
+SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE') or 100)
+
+# Secondi tra un ciclo di sincronizzazione e il successivo
+SYNC_INTERVAL = float(os.getenv('SYNC_INTERVAL') or 10)
+
+# Attesa massima (secondi) tra due tentativi quando il database remoto non risponde
+SYNC_MAX_BACKOFF = float(os.getenv('SYNC_MAX_BACKOFF') or 300)
+
+
+class SyncEngine:
+    """
+    Sincronizza le partite del SQLite locale con il database remoto
+    
+    Ogni gruppo di partite viene inviato in una sola transazione remota e solo
+    dopo il commit viene segnato come sincronizzato in locale. Se il processo
+    si interrompe tra i due passaggi il gruppo viene rinviato, e il database
+    remoto scarta le partite già presenti grazie al loro uuid.
+    
+    Se il database remoto rifiuta i dati di un gruppo (IntegrityError o
+    DataError del driver, vedi DATA_ERRORS), le partite vengono reinviate una
+    alla volta e quelle rifiutate messe da parte: una partita non valida non
+    ferma la sincronizzazione delle altre. Ogni altro errore interrompe il
+    ciclo e le partite restano in attesa.
+    """
+    
+    def __init__(self, local=None, remote_url=DATABASE_URL, remote_path=None,
+                 batch_size=SYNC_BATCH_SIZE, interval=SYNC_INTERVAL,
+                 max_backoff=SYNC_MAX_BACKOFF):
+        """
+        Args:
+            local: DatabaseManager del SQLite locale (default: quello condiviso)
+            remote_url: URL PostgreSQL di destinazione
+            remote_path: file SQLite di destinazione al posto di PostgreSQL (prove locali)
+        """
+        self.local = local or get_database_manager()
+        self.local.set_sync_index()
+        self.remote_url = None if remote_path else remote_url
+        self.remote_path = remote_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        
+        self.synced = 0
+        self.rejected = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_sync = None
+        
+        self._remote = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    @property
+    def remote(self):
+        """DatabaseManager remoto, creato (e quindi connesso) al primo utilizzo"""
+        if self._remote is None:
+            self._remote = DatabaseManager(database_url=self.remote_url, db_path=self.remote_path)
+        return self._remote
+    
+    def sync_once(self):
+        """
+        Invia tutte le partite in attesa, un gruppo alla volta
+        
+        Returns:
+            int: partite inviate
+        
+        Solleva l'eccezione del driver se il database remoto non è raggiungibile;
+        le partite non confermate restano in attesa. Le partite rifiutate per i
+        loro dati vengono messe da parte e non contano tra quelle inviate.
+        """
+        sent = 0
+        
+        with self._lock:
+            while True:
+                games = self.local.get_unsynced_games(self.batch_size)
+                if not games:
+                    break
+                
+                local_ids = [game.pop('local_id') for game in games]
+                try:
+                    self.remote.save_games(games)
+                except DATA_ERRORS:
+                    sent += self._sync_one_by_one(local_ids, games)
+                else:
+                    self.local.mark_games_synced(local_ids)
+                    sent += len(games)
+                    self.synced += len(games)
+                
+                if len(games) < self.batch_size or self._stop.is_set():
+                    break
+        
+        self.last_sync = time.time()
+        return sent
+    
+    def _sync_one_by_one(self, local_ids, games):
+        """
+        Invia le partite di un gruppo rifiutato una alla volta
+        
+        Returns:
+            int: partite inviate (le altre sono state messe da parte)
+        """
+        sent = 0
+        for local_id, game in zip(local_ids, games):
+            try:
+                self.remote.save_games([game])
+            except DATA_ERRORS as e:
+                self.local.mark_games_rejected([local_id])
+                self.rejected += 1
+                self.last_error = str(e)
+                print(f"⚠️  Partita locale {local_id} rifiutata dal database remoto e messa da parte: {e}")
+                continue
+            
+            self.local.mark_games_synced([local_id])
+            sent += 1
+            self.synced += 1
+        
+        return sent
+    
+    def pending(self):
+        """Numero di partite locali in attesa di sincronizzazione"""
+        return self.local.count_unsynced_games()
+    
+    # ==================== THREAD ====================
+    
+    def start(self):
+        """Avvia la sincronizzazione periodica in background"""
+        if self._thread is not None:
+            return
+        
+        self._thread = threading.Thread(target=self._run, name='sync', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+    
+    def stop(self, timeout=5):
+        """
+        Ferma il thread senza attendere oltre timeout
+        
+        Le partite non ancora inviate restano nel SQLite locale e partono al
+        prossimo avvio: l'uscita non resta mai bloccata da una rete lenta.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _run(self):
+        delay = 0
+        
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            
+            try:
+                self.sync_once()
+            except Exception as e:
+                # Database remoto irraggiungibile: riprova con attesa crescente
+                self.failures += 1
+                self.last_error = str(e)
+                self._remote = None
+                delay = min(self.interval * 2 ** min(self.failures, 10), self.max_backoff)
+                continue
+            
+            self.failures = 0
+            self.last_error = None
+            delay = self.interval
+
+
+# ==================== MOTORE CONDIVISO ====================
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_sync_engine(local=None):
+    """
+    Restituisce il SyncEngine condiviso dal processo (modalità ibrida)
+    
+    Args:
+        local: DatabaseManager locale (default: quello condiviso)
+    """
+    global _shared_engine
+    
+    # Fuori dal lock: in modalità ibrida get_database_manager richiama get_sync_engine
+    local = local or get_database_manager()
+    
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = SyncEngine(local=local)
+        return _shared_engine
+
+
+if __name__ == '__main__':
+    # Eseguito con -m questo modulo è __main__: il motore condiviso vive in src.sync
+    from src.sync import get_sync_engine
+    
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sincronizzazione con il database remoto")
+    parser.add_argument('--retry-rejected', action='store_true',
+                        help="rimette in coda le partite rifiutate in precedenza")
+    args = parser.parse_args()
+    
+    engine = get_sync_engine()
+    if args.retry_rejected:
+        print(f"🔁 Partite rifiutate rimesse in coda: {engine.local.requeue_rejected_games()}")
+    
+    print(f"🔄 Partite da sincronizzare: {engine.pending()}")
+    sent = engine.sync_once()
+    print(f"✅ Sincronizzate {sent} partite")
+    
+    rejected = engine.local.count_rejected_games()
+    if rejected:
+        print(f"⛔ Partite rifiutate dal database remoto: {rejected} "
+              f"(dopo la correzione: python -m src.sync --retry-rejected)")
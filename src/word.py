@@ -2,7 +2,8 @@
 
 # Classi Word, Noun, Verb, Adjective 
 
-from .normalization import compare_german_words
+from .grading import grade_article, grade_german
+from .normalization import AnswerForms
 
 # ==================== src/word.py ====================
 
@@ -10,49 +11,32 @@ from .normalization import compare_german_words
 class Word:
     """Classe base per tutte le parole"""
     
+    # Niente __dict__ per istanza: le parole del vocabolario sono migliaia
+    # e vengono referenziate dallo stato di ogni sessione
+    __slots__ = ('german', 'italian', 'frequency', 'forms')
+    
     def __init__(self, german, italian, frequency=1):
         self.german = german
         self.italian = italian
         self.frequency = int(frequency)  # Frequenza di uso (1 = molto frequente, 5 = raro)
+        self.forms = AnswerForms(german)  # Forme della risposta corretta, calcolate una volta
     
     def check_answer(self, user_answer):
         """
         Verifica la risposta dell'utente
         Ritorna: (is_correct, penalty, feedback)
         - is_correct: bool
-        - penalty: float (0 = corretto, 0.5 = mezzo errore, 1.0 = errore)
+        - penalty: float (0 = corretto, 0.5/0.75 = errore parziale, 1.0 = errore)
         - feedback: str (messaggio per l'utente)
         """
-        correct = self.german
-        
-        # Rimuovi spazi extra
-        user_answer = user_answer.strip()
-        
-        # Risposta esatta
-        if user_answer == correct:
-            return True, 0, "✅ CORRETTO!"
-        
-        # Usa la normalizzazione per confronti flessibili
-        if compare_german_words(user_answer, correct):
-            # Controlla solo le maiuscole se le parole sono equivalenti
-            if user_answer[0].islower() and correct[0].isupper():
-                return False, 0.5, f"⚠️ QUASI! Attenzione alle maiuscole: {correct}"
-            else:
-                return True, 0, "✅ CORRETTO!"
-        
-        # Errore di maiuscola (per sostantivi è grave)
-        if user_answer.lower() == correct.lower():
-            if user_answer[0].islower() and correct[0].isupper():
-                return False, 1.0, f"❌ SBAGLIATO! In tedesco i sostantivi iniziano con la MAIUSCOLA: {correct}"
-            return False, 0.5, f"⚠️ QUASI! Attenzione alle maiuscole: {correct}"
-        
-        # Errore completo
-        return False, 1.0, f"❌ SBAGLIATO! Risposta corretta: {correct}"
+        return grade_german(self.forms, user_answer)
 
 
 class Noun(Word):
     """Sostantivo tedesco"""
     
+    __slots__ = ('article', 'plural')
+    
     def __init__(self, german, article, plural, italian, frequency=1):
         super().__init__(german, italian, frequency)
         self.article = article  # der, die, das
@@ -63,13 +47,7 @@ class Noun(Word):
         Verifica l'articolo
         Ritorna: (is_correct, penalty, feedback)
         """
-        user_article = user_article.strip().lower()
-        correct = self.article.lower()
-        
-        if user_article == correct:
-            return True, 0, "✅ CORRETTO!"
-        
-        return False, 1.0, f"❌ SBAGLIATO! Risposta corretta: {self.article}"
+        return grade_article(self.article, user_article)
     
     def __str__(self):
         return f"{self.article} {self.german} ({self.plural})"
@@ -78,6 +56,8 @@ class Noun(Word):
 class Verb(Word):
     """Verbo tedesco"""
     
+    __slots__ = ('regular', 'prateritum', 'participio', 'perfetto', 'caso', 'riflessivo')
+    
     def __init__(self, german, regular, italian, prateritum, participio, 
                  perfetto, caso, riflessivo, frequency=1):
         super().__init__(german, italian, frequency)
@@ -95,6 +75,8 @@ class Verb(Word):
 class Adjective(Word):
     """Aggettivo tedesco"""
     
+    __slots__ = ('comparative', 'superlative')
+    
     def __init__(self, german, comparative, superlative, italian, frequency=1):
         super().__init__(german, italian, frequency)
         self.comparative = comparative
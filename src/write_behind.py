@@ -0,0 +1,466 @@
+# ==================== src/write_behind.py ====================
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from .database import get_database_manager, is_data_error
+
+
+def _env_flag(name):
+    """Legge un valore sì/no da una variabile d'ambiente"""
+    return (os.getenv(name) or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Scrittura differita delle partite (disattivata: save_game è sincrono)
+WRITE_BEHIND_ENABLED = _env_flag('WRITE_BEHIND_ENABLED')
+
+# Partite che possono attendere in coda prima di finire nel giornale locale
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv('WRITE_BEHIND_QUEUE_SIZE') or 100)
+
+# Partite confermate al massimo in una transazione
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE') or 20)
+
+# File SQLite dove finiscono le partite quando il database non è raggiungibile
+WRITE_BEHIND_JOURNAL = os.getenv('WRITE_BEHIND_JOURNAL') or 'write_behind_journal.db'
+
+# Secondi tra un tentativo e l'altro di recuperare le partite dal giornale
+WRITE_BEHIND_RETRY_INTERVAL = float(os.getenv('WRITE_BEHIND_RETRY_INTERVAL') or 30)
+
+# Chiavi degli errori salvate nel database (le altre servono solo all'interfaccia)
+ERROR_KEYS = ('word_german', 'word_italian', 'user_answer', 'correct_answer', 'penalty')
+OPTIONAL_ERROR_KEYS = ('confused_with',)
+
+
+def check_game(game):
+    """
+    Controlla la forma di una partita prima di accodarla
+    
+    Una partita malformata verrebbe scoperta solo nel thread, lontano da chi
+    l'ha salvata: meglio un errore subito, nella chiamata a save_game.
+    
+    Raises:
+        ValueError: se mancano campi o hanno un tipo sbagliato
+    """
+    for key in ('game_type', 'mode'):
+        if not isinstance(game[key], str) or not game[key]:
+            raise ValueError(f"Partita non valida: {key} deve essere una stringa non vuota")
+    
+    total, correct = game['total_questions'], game['correct_answers']
+    for key, value in (('total_questions', total), ('correct_answers', correct)):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise ValueError(f"Partita non valida: {key} deve essere un intero non negativo")
+    if correct > total:
+        raise ValueError("Partita non valida: correct_answers maggiore di total_questions")
+    
+    for error in game['errors']:
+        for key in ('word_german', 'word_italian', 'user_answer', 'correct_answer'):
+            if not isinstance(error[key], str):
+                raise ValueError(f"Errore non valido: {key} deve essere una stringa")
+        penalty = error['penalty']
+        if not isinstance(penalty, (int, float)) or isinstance(penalty, bool):
+            raise ValueError("Errore non valido: penalty deve essere un numero")
+        if error['confused_with'] is not None and not isinstance(error['confused_with'], str):
+            raise ValueError("Errore non valido: confused_with deve essere una stringa o None")
+
+
+class GameJournal:
+    """
+    Giornale SQLite locale delle partite non ancora salvate nel database
+    
+    pending_games contiene le partite da ritentare, rejected_games quelle che
+    il database ha rifiutato per i loro dati (in quarantena, non ritentate).
+    """
+    
+    def __init__(self, path=WRITE_BEHIND_JOURNAL):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending_games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rejected_games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                error TEXT NOT NULL,
+                rejected_at TEXT NOT NULL
+            )
+        """)
+        return conn
+    
+    def append(self, games):
+        """Aggiunge le partite al giornale"""
+        rows = [(json.dumps(self._encode(game)),) for game in games]
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.executemany("INSERT INTO pending_games (payload) VALUES (?)", rows)
+                conn.commit()
+            finally:
+                conn.close()
+    
+    def pending(self, limit):
+        """
+        Le partite più vecchie del giornale
+        
+        Returns:
+            list di tuple (id nel giornale, partita)
+        """
+        if not os.path.exists(self.path):
+            return []
+        
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT id, payload FROM pending_games ORDER BY id LIMIT ?", (limit,)
+                ).fetchall()
+            finally:
+                conn.close()
+        
+        return [(journal_id, self._decode(json.loads(payload))) for journal_id, payload in rows]
+    
+    def remove(self, journal_ids):
+        """Elimina dal giornale le partite ormai salvate"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.executemany("DELETE FROM pending_games WHERE id = ?",
+                                 [(journal_id,) for journal_id in journal_ids])
+                conn.commit()
+            finally:
+                conn.close()
+    
+    def reject(self, game, error):
+        """Mette in quarantena una partita rifiutata dal database"""
+        row = (json.dumps(self._encode(game)), str(error), datetime.now().isoformat())
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("INSERT INTO rejected_games (payload, error, rejected_at) VALUES (?, ?, ?)", row)
+                conn.commit()
+            finally:
+                conn.close()
+    
+    def count_rejected(self):
+        """Numero di partite in quarantena"""
+        if not os.path.exists(self.path):
+            return 0
+        
+        with self._lock:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT COUNT(*) FROM rejected_games").fetchone()[0]
+            finally:
+                conn.close()
+    
+    def count(self):
+        """Numero di partite in attesa nel giornale"""
+        if not os.path.exists(self.path):
+            return 0
+        
+        with self._lock:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT COUNT(*) FROM pending_games").fetchone()[0]
+            finally:
+                conn.close()
+    
+    @staticmethod
+    def _encode(game):
+        return dict(game, timestamp=game['timestamp'].isoformat())
+    
+    @staticmethod
+    def _decode(game):
+        return dict(game, timestamp=datetime.fromisoformat(game['timestamp']))
+
+
+class WriteBehindMetrics:
+    """Contatori della scrittura differita"""
+    
+    def __init__(self):
+        self.submitted = 0
+        self.committed = 0
+        self.batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.failures = 0
+        self.last_commit_latency = None
+        self.max_commit_latency = 0.0
+        self.total_commit_latency = 0.0
+        self._lock = threading.Lock()
+    
+    def add(self, **counters):
+        """Incrementa i contatori indicati"""
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+    
+    def record_commit(self, games, latency):
+        """Registra una transazione confermata e la sua durata in secondi"""
+        with self._lock:
+            self.committed += games
+            self.batches += 1
+            self.last_commit_latency = latency
+            self.max_commit_latency = max(self.max_commit_latency, latency)
+            self.total_commit_latency += latency
+    
+    @property
+    def avg_commit_latency(self):
+        return self.total_commit_latency / self.batches if self.batches else None
+
+
+class WriteBehindWriter:
+    """
+    Salva le partite in background
+    
+    save_game mette la partita in una coda limitata e ritorna subito; un
+    thread le conferma a gruppi con DatabaseManager.save_games. Se il database
+    non risponde (o la coda è piena) le partite finiscono nel giornale SQLite
+    locale e vengono ritentate ogni WRITE_BEHIND_RETRY_INTERVAL secondi.
+    
+    Se invece il database rifiuta i dati di un gruppo (is_data_error), le
+    partite vengono salvate una alla volta e quelle non valide messe in
+    quarantena: una partita sbagliata non blocca le altre.
+    """
+    
+    def __init__(self, db=None, queue_size=WRITE_BEHIND_QUEUE_SIZE,
+                 batch_size=WRITE_BEHIND_BATCH_SIZE, journal_path=WRITE_BEHIND_JOURNAL,
+                 retry_interval=WRITE_BEHIND_RETRY_INTERVAL):
+        self.db = db or get_database_manager()
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.journal = GameJournal(journal_path)
+        self.metrics = WriteBehindMetrics()
+        
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._next_replay = 0  # al primo giro recupera le partite rimaste da un'esecuzione precedente
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+    
+    def save_game(self, game_type, mode, total_questions, correct_answers, errors):
+        """
+        Accoda una partita (stessi argomenti di DatabaseManager.save_game)
+        
+        L'ora della partita è quella della chiamata, non quella del salvataggio.
+        
+        Raises:
+            ValueError: se la partita è malformata (vedi check_game)
+        """
+        try:
+            errors = [
+                {**{key: error[key] for key in ERROR_KEYS},
+                 **{key: error.get(key) for key in OPTIONAL_ERROR_KEYS}}
+                for error in errors
+            ]
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Errori della partita non validi: {e!r}") from e
+        
+        game = {
+            'game_type': game_type,
+            'mode': mode,
+            'total_questions': total_questions,
+            'correct_answers': correct_answers,
+            'errors': errors,
+            'timestamp': datetime.now(),
+            # Generato subito: se un commit riuscito viene ritentato dal
+            # giornale, il database scarta la copia
+            'game_uuid': str(uuid.uuid4()),
+        }
+        check_game(game)
+        self.metrics.add(submitted=1)
+        
+        if self._stop.is_set():
+            self._spill([game])
+            return
+        
+        try:
+            self._queue.put_nowait(game)
+        except queue.Full:
+            # Coda piena: la partita va subito nel giornale locale
+            self._spill([game])
+    
+    @property
+    def queue_depth(self):
+        """Partite in coda non ancora salvate"""
+        return self._queue.qsize()
+    
+    def get_metrics(self):
+        """Metriche correnti: profondità della coda, latenza dei commit, contatori"""
+        metrics = self.metrics
+        return {
+            'queue_depth': self.queue_depth,
+            'journal_depth': self.journal.count(),
+            'submitted': metrics.submitted,
+            'committed': metrics.committed,
+            'batches': metrics.batches,
+            'spilled': metrics.spilled,
+            'replayed': metrics.replayed,
+            'rejected': metrics.rejected,
+            'rejected_depth': self.journal.count_rejected(),
+            'failures': metrics.failures,
+            'last_commit_latency': metrics.last_commit_latency,
+            'avg_commit_latency': metrics.avg_commit_latency,
+            'max_commit_latency': metrics.max_commit_latency,
+        }
+    
+    def flush(self):
+        """Attende che tutte le partite in coda siano state salvate (o messe nel giornale)"""
+        self._queue.join()
+    
+    def close(self, timeout=10):
+        """Svuota la coda e ferma il thread (registrata anche con atexit)"""
+        if self._stop.is_set():
+            return
+        
+        self._stop.set()
+        self._thread.join(timeout)
+        
+        # Quello che il thread non ha fatto in tempo a salvare resta nel giornale
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if leftovers:
+            self._spill(leftovers)
+    
+    # ==================== THREAD ====================
+    
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                self._replay_journal()
+                continue
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                retry = self._save(batch)
+                if retry:
+                    self._spill(retry)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            
+            self._replay_journal()
+    
+    def _save(self, games):
+        """
+        Conferma un gruppo di partite
+        
+        Returns:
+            list delle partite da ritentare perché il database non è
+            raggiungibile: vuota se tutte sono state salvate o messe in
+            quarantena, altrimenti sempre la parte finale del gruppo
+        """
+        start = time.monotonic()
+        try:
+            self.db.save_games(games)
+        except Exception as e:
+            if is_data_error(e):
+                return self._save_one_by_one(games)
+            self._connection_failed(len(games), e)
+            return games
+        
+        self.metrics.record_commit(len(games), time.monotonic() - start)
+        return []
+    
+    def _save_one_by_one(self, games):
+        """Salva una alla volta le partite di un gruppo rifiutato (vedi _save)"""
+        for index, game in enumerate(games):
+            start = time.monotonic()
+            try:
+                self.db.save_games([game])
+            except Exception as e:
+                if not is_data_error(e):
+                    self._connection_failed(len(games) - index, e)
+                    return games[index:]
+                self.journal.reject(game, e)
+                self.metrics.add(rejected=1)
+                print(f"⚠️  Partita rifiutata dal database, messa in quarantena nel giornale: {e}")
+                continue
+            
+            self.metrics.record_commit(1, time.monotonic() - start)
+        
+        return []
+    
+    def _connection_failed(self, games, error):
+        self.metrics.add(failures=1)
+        self._next_replay = time.monotonic() + self.retry_interval
+        print(f"⚠️  Salvataggio differito non riuscito ({games} partite): {error}")
+    
+    def _spill(self, games):
+        """Mette le partite nel giornale locale"""
+        self.journal.append(games)
+        self.metrics.add(spilled=len(games))
+    
+    def _replay_journal(self):
+        """Riprova a salvare le partite del giornale, se è il momento"""
+        if time.monotonic() < self._next_replay:
+            return
+        self._next_replay = time.monotonic() + self.retry_interval
+        
+        while not self._stop.is_set():
+            pending = self.journal.pending(self.batch_size)
+            if not pending:
+                return
+            
+            retry = self._save([game for _, game in pending])
+            
+            # Le partite da ritentare sono sempre in fondo al gruppo: le altre
+            # sono salvate o in quarantena e lasciano il giornale
+            done = len(pending) - len(retry)
+            if done:
+                self.journal.remove([journal_id for journal_id, _ in pending[:done]])
+                self.metrics.add(replayed=done)
+            if retry:
+                return
+
+
+# ==================== WRITER CONDIVISO ====================
+
+_shared_writer = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_game_writer():
+    """
+    Restituisce l'oggetto da usare per salvare le partite
+    
+    Con WRITE_BEHIND_ENABLED è il WriteBehindWriter condiviso dal processo,
+    altrimenti il DatabaseManager condiviso: entrambi espongono save_game.
+    """
+    global _shared_writer
+    
+    if not WRITE_BEHIND_ENABLED:
+        return get_database_manager()
+    
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = WriteBehindWriter()
+            # atexit procede in ordine inverso: la coda viene svuotata prima
+            # che close_all_pools chiuda le connessioni
+            atexit.register(_shared_writer.close)
+        return _shared_writer
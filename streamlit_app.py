@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
 from src.data_loader import DataLoader
-from src.database import DatabaseManager
+from src.grading import (answer_forms, grade_article, grade_german, grade_german_in_vocabulary,
+                         grade_italian)
 from src.review_mode import ReviewMode
 from src.statistics import StatisticsManager
+from src.write_behind import WRITE_BEHIND_ENABLED, get_game_writer
 import random
 import streamlit.components.v1 as components
 
@@ -57,15 +58,7 @@ def reset_game():
 def start_game(game_type, mode, num_questions=10, words_to_use=None):
     """Inizia una nuova partita"""
     if words_to_use is None:
-        loader = DataLoader()
-        
-        # Carica i dati appropriati
-        if game_type == "Nomi":
-            words = loader.load_nouns()
-        elif game_type == "Verbi":
-            words = loader.load_verbs()
-        else:
-            words = loader.load_adjectives()
+        words = DataLoader().load_words(game_type)
         
         # Seleziona domande casuali
         st.session_state.questions = random.sample(words, min(num_questions, len(words)))
@@ -86,13 +79,7 @@ def start_game(game_type, mode, num_questions=10, words_to_use=None):
 def get_words_for_study(game_type, num_words, difficulty_mode='casual', difficulty_level=None):
     """Ottiene le parole per la modalità studio con filtro per difficoltà"""
     loader = DataLoader()
-    
-    if game_type == "Nomi":
-        words = loader.load_nouns()
-    elif game_type == "Verbi":
-        words = loader.load_verbs()
-    else:
-        words = loader.load_adjectives()
+    words = loader.load_words(game_type)
     
     # Filtra per difficoltà
     filtered_words = loader.get_words_by_difficulty(words, difficulty_mode, difficulty_level)
@@ -192,7 +179,7 @@ def play_deep_study_game(deep_study):
             if check_clicked or enter_pressed:
                 if user_answer.strip():
                     # Controlla la risposta
-                    is_correct, penalty = check_answer(user_answer, correct_answer, 
+                    is_correct, penalty, feedback_text, _ = check_answer(user_answer, correct_answer, 
                                                       is_conjugation=(deep_study['mode'] == 'Coniugazioni'),
                                                       is_reverse_translation=is_reverse_translation)
                     
@@ -222,8 +209,8 @@ def play_deep_study_game(deep_study):
                             feedback_type = 'warning'
                         deep_study['round_results'][word_idx] = True
                     else:
-                        feedback_message = f"❌ Sbagliata! Da ripassare nel prossimo round.\n💡 Risposta corretta: **{correct_answer}**"
-                        feedback_type = 'error'
+                        feedback_message = f"{feedback_text}\n\n🔁 Da ripassare nel prossimo round."
+                        feedback_type = 'warning' if penalty < 1.0 else 'error'
                         deep_study['round_results'][word_idx] = False
                         # Incrementa la difficoltà solo se non padroneggiata
                         if word_idx not in deep_study['word_difficulty']:
@@ -447,8 +434,7 @@ def show_deep_study_results(deep_study):
     # Salva nel database
     if st.button("💾 Salva Risultati", type="primary"):
         # Salva nel database
-        db = DatabaseManager()
-        db.save_game(
+        get_game_writer().save_game(
             game_type=f"{deep_study['game_type']} (Studio Approfondito)",
             mode=deep_study['mode'],
             total_questions=total_questions,
@@ -467,11 +453,11 @@ def show_enhanced_stats():
     """Mostra statistiche avanzate"""
     st.header("📊 Statistiche Avanzate")
     
-    db = DatabaseManager()
     stats_manager = StatisticsManager()
-    games = db.get_game_history(limit=1000)
+    snapshot = stats_manager.get_snapshot()
+    overall = snapshot.overall
     
-    if not games:
+    if not snapshot.has_games:
         st.info("Nessuna partita giocata ancora. Inizia a giocare!")
         return
     
@@ -480,60 +466,34 @@ def show_enhanced_stats():
     
     col1, col2, col3, col4 = st.columns(4)
     
-    total_games = len(games)
-    total_questions = sum(game[4] for game in games)
-    total_correct = sum(game[5] for game in games)
-    avg_success = sum(game[6] for game in games) / total_games
+    total_questions = overall['total_questions']
+    total_correct = overall['total_correct']
     
     with col1:
-        st.metric("Partite Totali", total_games)
+        st.metric("Partite Totali", overall['games'])
     with col2:
         st.metric("Domande Totali", total_questions)
     with col3:
         st.metric("Risposte Corrette", f"{total_correct}/{total_questions}")
     with col4:
-        st.metric("Media Successo", f"{avg_success:.1f}%")
+        st.metric("Media Successo", f"{overall['avg_success']:.1f}%")
     
     # Miglior partita
-    best_game = max(games, key=lambda x: x[6])
+    best_game = snapshot.best_game
     st.info(f"🏆 **Miglior partita**: {best_game[6]:.1f}% di successo ({best_game[2]} - {best_game[3]})")
     
     # Progresso nel tempo
     st.subheader("📈 Progresso nel Tempo")
     
-    # Raggruppa per settimana
-    weekly_stats = defaultdict(lambda: {'games': 0, 'total_success': 0})
+    # Ultime 4 settimane con partite, raggruppate dal database
+    weekly_stats = snapshot.weekly
     
-    for game in games:
-        try:
-            # Gestisce diversi formati di timestamp
-            if isinstance(game[1], str):
-                timestamp = datetime.fromisoformat(game[1])
-            elif isinstance(game[1], datetime):
-                timestamp = game[1]
-            else:
-                # Se non è né stringa né datetime, salta questo record
-                continue
-                
-            week_start = timestamp - timedelta(days=timestamp.weekday())
-            week_key = week_start.strftime("%Y-%m-%d")
-            
-            weekly_stats[week_key]['games'] += 1
-            weekly_stats[week_key]['total_success'] += game[6]
-        except (ValueError, TypeError) as e:
-            # Salta record con timestamp non validi
-            continue
-    
-    # Mostra ultime 4 settimane
-    sorted_weeks = sorted(weekly_stats.items(), reverse=True)[:4]
-    
-    if sorted_weeks:
+    if weekly_stats:
         weekly_data = []
-        for week, stats in sorted_weeks:
-            avg = stats['total_success'] / stats['games']
+        for week, games_count, avg in weekly_stats:
             weekly_data.append({
                 'Settimana': week,
-                'Partite': stats['games'],
+                'Partite': games_count,
                 'Media Successo (%)': round(avg, 1)
             })
         
@@ -543,18 +503,15 @@ def show_enhanced_stats():
     # Analisi per categoria
     st.subheader("📚 Analisi per Categoria")
     
-    categories = ['Nomi', 'Verbi', 'Aggettivi']
     category_stats = []
     
-    for game_type in categories:
-        stats = db.get_stats_by_type(game_type)
-        if stats:
-            category_stats.append({
-                'Categoria': game_type,
-                'Partite': stats['games'],
-                'Media Successo (%)': round(stats['avg_success'], 1),
-                'Parole Studiate': stats['total_questions']
-            })
+    for game_type, stats in snapshot.category_stats.items():
+        category_stats.append({
+            'Categoria': game_type,
+            'Partite': stats['games'],
+            'Media Successo (%)': round(stats['avg_success'], 1),
+            'Parole Studiate': stats['total_questions']
+        })
     
     if category_stats:
         df_categories = pd.DataFrame(category_stats)
@@ -563,7 +520,7 @@ def show_enhanced_stats():
     # Parole più difficili
     st.subheader("❌ Parole Più Difficili")
     
-    errors = db.get_most_common_errors(limit=15)
+    errors = snapshot.common_errors[:15]
     if errors:
         error_data = []
         for german, italian, count in errors:
@@ -578,151 +535,163 @@ def show_enhanced_stats():
     else:
         st.success("✨ Nessun errore registrato! Continua così!")
     
+    # Parole confuse con altre del vocabolario
+    pairs = snapshot.confused_pairs[:15]
+    if pairs:
+        st.subheader("🔀 Parole Confuse")
+        df_pairs = pd.DataFrame(pairs, columns=['Tedesco', 'Italiano', 'Scritto al suo posto', 'Volte'])
+        st.dataframe(df_pairs, use_container_width=True)
+    
     # Streak e record
     st.subheader("🔥 Streak e Record")
     
-    # Calcola streak corrente
-    dates = []
-    for game in games:
-        try:
-            if isinstance(game[1], str):
-                timestamp = datetime.fromisoformat(game[1])
-            elif isinstance(game[1], datetime):
-                timestamp = game[1]
-            else:
-                continue
-            dates.append(timestamp.date())
-        except (ValueError, TypeError):
-            continue
-    dates = sorted(set(dates), reverse=True)
-    
-    current_streak = 0
-    if dates:
-        today = datetime.now().date()
-        if dates[0] == today or dates[0] == today - timedelta(days=1):
-            current_streak = 1
-            for i in range(len(dates) - 1):
-                if (dates[i] - dates[i+1]).days == 1:
-                    current_streak += 1
-                else:
-                    break
-    
-    # Trova la longest streak
-    longest_streak = 1
-    temp_streak = 1
-    for i in range(len(dates) - 1):
-        if (dates[i] - dates[i+1]).days == 1:
-            temp_streak += 1
-            longest_streak = max(longest_streak, temp_streak)
-        else:
-            temp_streak = 1
-    
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Streak Corrente", f"{current_streak} giorni")
+        st.metric("Streak Corrente", f"{snapshot.current_streak} giorni")
     with col2:
-        st.metric("Miglior Streak", f"{longest_streak} giorni")
+        st.metric("Miglior Streak", f"{snapshot.longest_streak} giorni")
     with col3:
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_games = []
-        for g in games:
-            try:
-                if isinstance(g[1], str):
-                    timestamp = datetime.fromisoformat(g[1])
-                elif isinstance(g[1], datetime):
-                    timestamp = g[1]
-                else:
-                    continue
-                if timestamp > week_ago:
-                    recent_games.append(g)
-            except (ValueError, TypeError):
-                continue
-        st.metric("Partite Questa Settimana", len(recent_games))
+        st.metric("Partite Questa Settimana", snapshot.games_last_week)
     
     # Storico partite
     st.subheader("📋 Storico Partite Recenti")
-    df = pd.DataFrame(games, columns=['ID', 'Data', 'Tipo', 'Modalità', 'Domande', 'Corrette', 'Successo%'])
-    
-    # Gestisce diversi formati di timestamp per la visualizzazione
-    try:
-        df['Data'] = pd.to_datetime(df['Data']).dt.strftime('%Y-%m-%d %H:%M')
-    except Exception:
-        # Se la conversione fallisce, mostra i timestamp come sono
-        pass
-    
-    st.dataframe(df.head(20), use_container_width=True)
+    show_history_table(stats_manager)
     
     # Pulsante per esportare
     if st.button("📥 Esporta Statistiche"):
         filename = f"stats_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-        stats_manager.export_statistics(filename)
+        stats_manager.export_statistics(filename, snapshot=snapshot)
         st.success(f"Statistiche esportate in {filename}!")
+    
+    # Metriche del salvataggio differito (solo se attivo)
+    if WRITE_BEHIND_ENABLED:
+        metrics = get_game_writer().get_metrics()
+        with st.expander("⏱️ Salvataggio differito"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Partite in coda", metrics['queue_depth'])
+            with col2:
+                st.metric("Nel giornale locale", metrics['journal_depth'])
+            with col3:
+                latency = metrics['avg_commit_latency']
+                st.metric("Latenza media commit", f"{latency * 1000:.0f} ms" if latency is not None else "—")
+            st.caption(f"Salvate: {metrics['committed']} in {metrics['batches']} commit · "
+                       f"Errori: {metrics['failures']} · Recuperate dal giornale: {metrics['replayed']} · "
+                       f"Rifiutate (in quarantena): {metrics['rejected_depth']}")
 
 
-def check_answer(user_answer, correct_answer, is_articles=False, is_conjugation=False, is_reverse_translation=False):
-    """Verifica la risposta e calcola la penalità usando il sistema di normalizzazione"""
-    from src.word import Word
-    from src.normalization import compare_german_words
+def show_history_table(stats_manager, page_size=20):
+    """Storico partite paginato: viene letta solo la pagina mostrata"""
+    if 'history_cursors' not in st.session_state:
+        # Cursore di partenza di ogni pagina visitata (None = prima pagina)
+        st.session_state.history_cursors = [None]
+    
+    cursors = st.session_state.history_cursors
+    games, next_cursor = stats_manager.get_history_page(cursors[-1], page_size)
+    
+    df = pd.DataFrame(games, columns=['ID', 'Data', 'Tipo', 'Modalità', 'Domande', 'Corrette', 'Successo%'])
+    
+    # Il database restituisce sempre datetime
+    df['Data'] = pd.to_datetime(df['Data']).dt.strftime('%Y-%m-%d %H:%M')
+    
+    st.dataframe(df, use_container_width=True)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Precedenti", disabled=len(cursors) == 1, key="history_prev"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Pagina {len(cursors)}")
+    with col3:
+        if st.button("Successive ➡️", disabled=next_cursor is None, key="history_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+
+def check_answer(user_answer, correct_answer, is_articles=False, is_conjugation=False, is_reverse_translation=False,
+                 word=None):
+    """
+    Verifica la risposta e calcola la penalità usando il sistema di normalizzazione
+    
+    Con word, nella traduzione verso il tedesco riconosce anche le risposte
+    che sono un'altra parola del vocabolario (errore completo).
+    
+    Returns:
+        tuple (is_correct, penalty, feedback, confused): feedback è il messaggio
+        del valutatore, confused la Word scritta al posto di quella richiesta o None
+    """
+    confused = None
     
     # Per articoli, confronto semplice
     if is_articles:
-        if user_answer.strip().lower() == correct_answer.strip().lower():
-            return True, 0.0
-        return False, 1.0
-    
-    # Per coniugazioni verbali, usa il sistema di normalizzazione
-    if is_conjugation:
-        # Crea una parola temporanea per il controllo
-        temp_word = Word(correct_answer, "temp")
-        is_correct, penalty, feedback = temp_word.check_answer(user_answer)
-        return is_correct, penalty
-    
-    # Per traduzione inversa (tedesco → italiano), confronto semplice
-    if is_reverse_translation:
-        if user_answer.strip() == correct_answer.strip():
-            return True, 0.0
-        elif user_answer.strip().lower() == correct_answer.strip().lower():
-            return False, 0.5  # Mezzo errore per maiuscola
-        return False, 1.0
-    
-    # Per traduzione normale (italiano → tedesco), usa il sistema di normalizzazione
-    # Crea una parola temporanea per il controllo
-    temp_word = Word(correct_answer, "temp")
-    is_correct, penalty, feedback = temp_word.check_answer(user_answer)
-    return is_correct, penalty
+        is_correct, penalty, feedback = grade_article(correct_answer, user_answer)
+    
+    # Per traduzione inversa (tedesco → italiano), conta solo la maiuscola
+    elif is_reverse_translation:
+        is_correct, penalty, feedback = grade_italian(correct_answer, user_answer)
+    
+    # Traduzione verso il tedesco: anche le parole confuse con altre del vocabolario
+    elif word is not None and not is_conjugation:
+        is_correct, penalty, feedback, confused = grade_german_in_vocabulary(
+            word.forms, user_answer, DataLoader().get_vocabularies()
+        )
+    
+    # Traduzione e coniugazioni in tedesco: umlaut e ß flessibili,
+    # con le forme della risposta corretta in cache
+    else:
+        is_correct, penalty, feedback = grade_german(answer_forms(correct_answer), user_answer)
+    
+    return is_correct, float(penalty), feedback, confused
+
+
+def error_type_for(penalty, feedback):
+    """Tipo di errore mostrato nel riepilogo, dal feedback del valutatore"""
+    if "battitura" in feedback:
+        return "battitura"
+    if "maiuscol" in feedback.lower():
+        return "maiuscola"
+    if "accenti" in feedback:
+        return "accento"
+    return "completo"
 
 
 def show_stats():
     """Mostra statistiche dal database"""
     st.header("📊 Statistiche")
     
-    db = DatabaseManager()
-    games = db.get_game_history(limit=100)
+    stats_manager = StatisticsManager()
+    snapshot = stats_manager.get_snapshot(errors_limit=10)
     
-    if games:
-        df = pd.DataFrame(games, columns=['ID', 'Data', 'Tipo', 'Modalità', 'Domande', 'Corrette', 'Successo%'])
+    if snapshot.has_games:
+        overall = snapshot.overall
         
         # Statistiche generali
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Partite Totali", len(df))
+            st.metric("Partite Totali", overall['games'])
         with col2:
-            st.metric("Media Successo", f"{df['Successo%'].mean():.1f}%")
+            st.metric("Media Successo", f"{overall['avg_success']:.1f}%")
         with col3:
-            total_questions = df['Domande'].sum()
-            total_correct = df['Corrette'].sum()
-            st.metric("Risposte Corrette", f"{total_correct}/{total_questions}")
+            st.metric("Risposte Corrette", f"{overall['total_correct']}/{overall['total_questions']}")
         
         # Tabella delle partite
         st.subheader("Storico Partite")
-        st.dataframe(df, use_container_width=True)
+        show_history_table(stats_manager, page_size=50)
         
         # Errori più frequenti
-        errors = db.get_most_common_errors(limit=10)
+        errors = snapshot.common_errors
         if errors:
             st.subheader("🎯 Parole Più Sbagliate")
             error_df = pd.DataFrame(errors, columns=['Tedesco', 'Italiano', 'N° Errori'])
             st.dataframe(error_df, use_container_width=True)
+        
+        # Parole confuse con altre del vocabolario
+        pairs = snapshot.confused_pairs
+        if pairs:
+            st.subheader("🔀 Parole Confuse")
+            pairs_df = pd.DataFrame(pairs, columns=['Tedesco', 'Italiano', 'Scritto al suo posto', 'N° Volte'])
+            st.dataframe(pairs_df, use_container_width=True)
     else:
         st.info("Nessuna partita giocata ancora. Inizia a giocare!")
 
@@ -846,6 +815,8 @@ if page == "🎮 Gioca":
             if feedback is not None:
                 if feedback['ok']:
                     st.success(feedback['message'])
+                elif feedback.get('near_miss'):
+                    st.warning(feedback['message'])
                 else:
                     st.error(feedback['message'])
                 st.divider()
@@ -869,7 +840,10 @@ if page == "🎮 Gioca":
                         )
                         submitted = st.form_submit_button("✅ Verifica (Invio)")
                         if submitted:
-                            ok, penalty = check_answer(user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation)
+                            ok, penalty, feedback_text, confused = check_answer(
+                                user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation,
+                                word=word
+                            )
                             if ok:
                                 st.session_state.score += 1
                                 st.session_state.feedback_by_q[current_idx] = {
@@ -877,22 +851,22 @@ if page == "🎮 Gioca":
                                     'message': "✅ Corretto!"
                                 }
                             else:
-                                error_type = "maiuscola" if penalty == 1.0 else "umlaut" if penalty == 0.5 else "completo"
+                                error_type = error_type_for(penalty, feedback_text)
                                 st.session_state.errors.append({
                                     'word_german': word.german,
                                     'word_italian': word.italian,
                                     'user_answer': user_answer,
                                     'correct_answer': correct_answer,
                                     'penalty': penalty,
-                                    'error_type': error_type
+                                    'error_type': error_type,
+                                    'confused_with': confused.german if confused else None
                                 })
-                                # Sistema di punteggio cumulativo: 0.5 punti per mezzo errore, 0 per errore completo
-                                if penalty == 0.5:
-                                    st.session_state.score += 0.5
-                                # 0 punti per errore completo (penalty == 1.0)
+                                # Sistema di punteggio cumulativo: 1 - penalità (0.5 per mezzo errore, 0 per errore completo)
+                                st.session_state.score += 1 - penalty
                                 st.session_state.feedback_by_q[current_idx] = {
                                     'ok': False,
-                                    'message': f"❌ Sbagliato! Risposta corretta: {correct_answer}"
+                                    'near_miss': penalty < 1.0,
+                                    'message': feedback_text
                                 }
                             st.rerun()
                 else:
@@ -904,7 +878,7 @@ if page == "🎮 Gioca":
                     col_a, col_b = st.columns(2)
                     with col_a:
                         if st.button("✅ Verifica", key=f"check_{current_idx}", use_container_width=True):
-                            ok, penalty = check_answer(user_answer, correct_answer, is_articles)
+                            ok, penalty, feedback_text, _ = check_answer(user_answer, correct_answer, is_articles)
                             if ok:
                                 st.session_state.score += 1
                                 st.session_state.feedback_by_q[current_idx] = {
@@ -912,7 +886,7 @@ if page == "🎮 Gioca":
                                     'message': "✅ Corretto!"
                                 }
                             else:
-                                error_type = "completo" if penalty == 1.0 else "umlaut"
+                                error_type = error_type_for(penalty, feedback_text)
                                 st.session_state.errors.append({
                                     'word_german': word.german,
                                     'word_italian': word.italian,
@@ -921,13 +895,11 @@ if page == "🎮 Gioca":
                                     'penalty': penalty,
                                     'error_type': error_type
                                 })
-                                # Sistema di punteggio cumulativo: 0.5 punti per mezzo errore, 0 per errore completo
-                                if penalty == 0.5:
-                                    st.session_state.score += 0.5
-                                # 0 punti per errore completo (penalty == 1.0)
+                                # Sistema di punteggio cumulativo: 1 - penalità (0.5 per mezzo errore, 0 per errore completo)
+                                st.session_state.score += 1 - penalty
                                 st.session_state.feedback_by_q[current_idx] = {
                                     'ok': False,
-                                    'message': f"❌ Sbagliato! Risposta corretta: {correct_answer}"
+                                    'message': feedback_text
                                 }
                             st.rerun()
                     with col_b:
@@ -992,8 +964,7 @@ if page == "🎮 Gioca":
                         st.write(f"**Penalità:** -{error['penalty']}")
             
             # Salva nel database
-            db = DatabaseManager()
-            db.save_game(
+            get_game_writer().save_game(
                 game_type=st.session_state.game_type,
                 mode=st.session_state.mode,
                 total_questions=total_questions,
@@ -1074,13 +1045,9 @@ elif page == "📚 Studio":
         # Mostra statistiche sulla distribuzione delle difficoltà
         if game_type:
             loader = DataLoader()
-            if game_type == "Nomi":
-                all_words = loader.load_nouns()
-            elif game_type == "Verbi":
-                all_words = loader.load_verbs()
-            else:
-                all_words = loader.load_adjectives()
+            all_words = loader.load_words(game_type)
             
+            # Conteggi precalcolati dall'indice per frequenza del vocabolario
             stats = loader.get_difficulty_stats(all_words)
             
             col1, col2, col3 = st.columns(3)
@@ -1090,11 +1057,10 @@ elif page == "📚 Studio":
                 st.metric("Livelli Disponibili", len(stats))
             with col3:
                 if difficulty_mode == 'fixed' and difficulty_level:
-                    filtered = loader.get_words_by_difficulty(all_words, 'fixed', difficulty_level)
-                    st.metric("Parole Disponibili", len(filtered))
+                    available = loader.count_words_up_to_level(all_words, difficulty_level)
+                    st.metric("Parole Disponibili", available)
                 elif difficulty_mode == 'focus' and difficulty_level:
-                    filtered = loader.get_words_by_difficulty(all_words, 'focus', difficulty_level)
-                    st.metric("Parole Disponibili", len(filtered))
+                    st.metric("Parole Disponibili", stats.get(difficulty_level, 0))
                 else:
                     st.metric("Modalità", "Casuale")
         
@@ -1193,6 +1159,8 @@ elif page == "📚 Studio":
             if feedback is not None:
                 if feedback['ok']:
                     st.success(feedback['message'])
+                elif feedback.get('near_miss'):
+                    st.warning(feedback['message'])
                 else:
                     st.error(feedback['message'])
                 st.divider()
@@ -1216,7 +1184,10 @@ elif page == "📚 Studio":
                         )
                         submitted = st.form_submit_button("✅ Verifica (Invio)")
                         if submitted:
-                            ok, penalty = check_answer(user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation)
+                            ok, penalty, feedback_text, confused = check_answer(
+                                user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation,
+                                word=word
+                            )
                             if ok:
                                 st.session_state.score += 1
                                 st.session_state.feedback_by_q[current_idx] = {
@@ -1224,22 +1195,22 @@ elif page == "📚 Studio":
                                     'message': "✅ Corretto!"
                                 }
                             else:
-                                error_type = "maiuscola" if penalty == 1.0 else "umlaut" if penalty == 0.5 else "completo"
+                                error_type = error_type_for(penalty, feedback_text)
                                 st.session_state.errors.append({
                                     'word_german': word.german,
                                     'word_italian': word.italian,
                                     'user_answer': user_answer,
                                     'correct_answer': correct_answer,
                                     'penalty': penalty,
-                                    'error_type': error_type
+                                    'error_type': error_type,
+                                    'confused_with': confused.german if confused else None
                                 })
-                                # Sistema di punteggio cumulativo: 0.5 punti per mezzo errore, 0 per errore completo
-                                if penalty == 0.5:
-                                    st.session_state.score += 0.5
-                                # 0 punti per errore completo (penalty == 1.0)
+                                # Sistema di punteggio cumulativo: 1 - penalità (0.5 per mezzo errore, 0 per errore completo)
+                                st.session_state.score += 1 - penalty
                                 st.session_state.feedback_by_q[current_idx] = {
                                     'ok': False,
-                                    'message': f"❌ Sbagliato! Risposta corretta: {correct_answer}"
+                                    'near_miss': penalty < 1.0,
+                                    'message': feedback_text
                                 }
                             st.rerun()
                 else:
@@ -1251,7 +1222,10 @@ elif page == "📚 Studio":
                     col_a, col_b = st.columns(2)
                     with col_a:
                         if st.button("✅ Verifica", key=f"check_{current_idx}", use_container_width=True):
-                            ok, penalty = check_answer(user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation)
+                            ok, penalty, feedback_text, confused = check_answer(
+                                user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation,
+                                word=word
+                            )
                             if ok:
                                 st.session_state.score += 1
                                 st.session_state.feedback_by_q[current_idx] = {
@@ -1259,7 +1233,7 @@ elif page == "📚 Studio":
                                     'message': "✅ Corretto!"
                                 }
                             else:
-                                error_type = "completo" if penalty == 1.0 else "umlaut"
+                                error_type = error_type_for(penalty, feedback_text)
                                 st.session_state.errors.append({
                                     'word_german': word.german,
                                     'word_italian': word.italian,
@@ -1268,13 +1242,11 @@ elif page == "📚 Studio":
                                     'penalty': penalty,
                                     'error_type': error_type
                                 })
-                                # Sistema di punteggio cumulativo: 0.5 punti per mezzo errore, 0 per errore completo
-                                if penalty == 0.5:
-                                    st.session_state.score += 0.5
-                                # 0 punti per errore completo (penalty == 1.0)
+                                # Sistema di punteggio cumulativo: 1 - penalità (0.5 per mezzo errore, 0 per errore completo)
+                                st.session_state.score += 1 - penalty
                                 st.session_state.feedback_by_q[current_idx] = {
                                     'ok': False,
-                                    'message': f"❌ Sbagliato! Risposta corretta: {correct_answer}"
+                                    'message': feedback_text
                                 }
                             st.rerun()
                     with col_b:
@@ -1340,8 +1312,7 @@ elif page == "📚 Studio":
                         st.write(f"**Penalità:** -{error['penalty']}")
             
             # Salva nel database
-            db = DatabaseManager()
-            db.save_game(
+            get_game_writer().save_game(
                 game_type=f"{st.session_state.game_type} (Studio)",
                 mode=st.session_state.mode,
                 total_questions=total_questions,
@@ -1363,8 +1334,8 @@ elif page == "🎯 Studio Approfondito":
     # Selezione tipo di gioco
     game_type = st.selectbox("Scegli cosa studiare:", ["Nomi", "Verbi", "Aggettivi"])
     
-    # Carica le parole (usiamo un numero alto per ottenere tutte le parole disponibili)
-    words = get_words_for_study(game_type, 1000)
+    # Carica tutte le parole della categoria
+    words = DataLoader().load_words(game_type)
     
     if words:
         # Selezione modalità di gioco
@@ -1543,6 +1514,8 @@ elif page == "🔄 Ripasso":
             if feedback is not None:
                 if feedback['ok']:
                     st.success(feedback['message'])
+                elif feedback.get('near_miss'):
+                    st.warning(feedback['message'])
                 else:
                     st.error(feedback['message'])
                 st.divider()
@@ -1566,7 +1539,10 @@ elif page == "🔄 Ripasso":
                         )
                         submitted = st.form_submit_button("✅ Verifica (Invio)")
                         if submitted:
-                            ok, penalty = check_answer(user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation)
+                            ok, penalty, feedback_text, confused = check_answer(
+                                user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation,
+                                word=word
+                            )
                             if ok:
                                 st.session_state.score += 1
                                 st.session_state.feedback_by_q[current_idx] = {
@@ -1574,22 +1550,22 @@ elif page == "🔄 Ripasso":
                                     'message': "✅ Corretto!"
                                 }
                             else:
-                                error_type = "maiuscola" if penalty == 1.0 else "umlaut" if penalty == 0.5 else "completo"
+                                error_type = error_type_for(penalty, feedback_text)
                                 st.session_state.errors.append({
                                     'word_german': word.german,
                                     'word_italian': word.italian,
                                     'user_answer': user_answer,
                                     'correct_answer': correct_answer,
                                     'penalty': penalty,
-                                    'error_type': error_type
+                                    'error_type': error_type,
+                                    'confused_with': confused.german if confused else None
                                 })
-                                # Sistema di punteggio cumulativo: 0.5 punti per mezzo errore, 0 per errore completo
-                                if penalty == 0.5:
-                                    st.session_state.score += 0.5
-                                # 0 punti per errore completo (penalty == 1.0)
+                                # Sistema di punteggio cumulativo: 1 - penalità (0.5 per mezzo errore, 0 per errore completo)
+                                st.session_state.score += 1 - penalty
                                 st.session_state.feedback_by_q[current_idx] = {
                                     'ok': False,
-                                    'message': f"❌ Sbagliato! Risposta corretta: {correct_answer}"
+                                    'near_miss': penalty < 1.0,
+                                    'message': feedback_text
                                 }
                             st.rerun()
                 else:
@@ -1601,7 +1577,10 @@ elif page == "🔄 Ripasso":
                     col_a, col_b = st.columns(2)
                     with col_a:
                         if st.button("✅ Verifica", key=f"check_{current_idx}", use_container_width=True):
-                            ok, penalty = check_answer(user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation)
+                            ok, penalty, feedback_text, confused = check_answer(
+                                user_answer, correct_answer, is_articles, is_conjugations, is_reverse_translation,
+                                word=word
+                            )
                             if ok:
                                 st.session_state.score += 1
                                 st.session_state.feedback_by_q[current_idx] = {
@@ -1609,7 +1588,7 @@ elif page == "🔄 Ripasso":
                                     'message': "✅ Corretto!"
                                 }
                             else:
-                                error_type = "completo" if penalty == 1.0 else "umlaut"
+                                error_type = error_type_for(penalty, feedback_text)
                                 st.session_state.errors.append({
                                     'word_german': word.german,
                                     'word_italian': word.italian,
@@ -1618,13 +1597,11 @@ elif page == "🔄 Ripasso":
                                     'penalty': penalty,
                                     'error_type': error_type
                                 })
-                                # Sistema di punteggio cumulativo: 0.5 punti per mezzo errore, 0 per errore completo
-                                if penalty == 0.5:
-                                    st.session_state.score += 0.5
-                                # 0 punti per errore completo (penalty == 1.0)
+                                # Sistema di punteggio cumulativo: 1 - penalità (0.5 per mezzo errore, 0 per errore completo)
+                                st.session_state.score += 1 - penalty
                                 st.session_state.feedback_by_q[current_idx] = {
                                     'ok': False,
-                                    'message': f"❌ Sbagliato! Risposta corretta: {correct_answer}"
+                                    'message': feedback_text
                                 }
                             st.rerun()
                     with col_b:
@@ -1690,8 +1667,7 @@ elif page == "🔄 Ripasso":
                         st.write(f"**Penalità:** -{error['penalty']}")
             
             # Salva nel database
-            db = DatabaseManager()
-            db.save_game(
+            get_game_writer().save_game(
                 game_type=f"{st.session_state.game_type} (Ripasso)",
                 mode=st.session_state.mode,
                 total_questions=total_questions,
@@ -1752,6 +1728,9 @@ else:
         - ❌ **Errore maiuscola** (nomi, traduzione normale): -1 punto
         - ⚠️ **Errore maiuscola** (traduzione inversa, coniugazioni): -0.5 punti
         - ⚠️ **Errore umlaut** (ä, ö, ü, ß): -0.5 punti
+        - ⚠️ **Errore di accento** (traduzione inversa, es. "citta" per "città"): -0.5 punti
+        - ⚠️ **Errore di battitura** (una lettera, parole da 4 lettere in su): -0.5 punti
+        - ⚠️ **Due errori di battitura** (parole da 8 lettere in su): -0.75 punti
         - ❌ **Errore completo**: -1 punto
         - 👁️ **Vedi risposta**: -1 punto
         
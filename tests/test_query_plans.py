@@ -0,0 +1,114 @@
+# ==================== tests/test_query_plans.py ====================
+
+# Piani delle query principali su SQLite: ogni lettura deve usare il suo
+# indice (src/migrations.py) invece di scorrere o ordinare la tabella
+
+import pytest
+from src.database import DatabaseManager
+from src.migrations import MigrationRunner
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Database SQLite temporaneo con qualche partita e qualche errore"""
+    db = DatabaseManager(db_path=str(tmp_path / 'games.db'))
+    for i in range(5):
+        db.save_game('Nomi', 'Traduzione', 10, 8, [
+            {'word_german': 'Tag', 'word_italian': 'giorno', 'user_answer': 'Zeit',
+             'correct_answer': 'Tag', 'penalty': 1.0, 'confused_with': 'Zeit'},
+            {'word_german': 'Haus', 'word_italian': 'casa', 'user_answer': 'Hause',
+             'correct_answer': 'Haus', 'penalty': 0.5},
+        ])
+    return db
+
+
+def query_plans(db, call):
+    """
+    Esegue call(db) e restituisce le SELECT eseguite con il loro piano
+    
+    Returns:
+        list di tuple (sql, dettagli di EXPLAIN QUERY PLAN)
+    """
+    statements = []
+    with db.pool.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            call(db)
+        finally:
+            conn.set_trace_callback(None)
+        
+        return [
+            (sql, [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")])
+            for sql in statements
+            if sql.lstrip().upper().startswith('SELECT')
+        ]
+
+
+def assert_uses_index(db, call, index):
+    """Tutte le SELECT di call usano index, senza ordinamenti temporanei"""
+    plans = query_plans(db, call)
+    assert plans, "nessuna SELECT eseguita"
+    for sql, plan in plans:
+        detail = ' | '.join(plan)
+        assert index in detail, f"{sql}\n→ {detail}"
+        assert 'TEMP B-TREE' not in detail, f"{sql}\n→ {detail}"
+
+
+# Indici secondari creati dalle migrazioni
+INDEXES = {
+    'idx_errors_game_id', 'idx_errors_word', 'idx_errors_confused',
+    'idx_games_timestamp_id', 'idx_games_game_type', 'idx_games_category',
+    'idx_games_uuid', 'idx_games_week', 'idx_word_error_stats_category',
+}
+
+
+def test_indexes_created_idempotently(db):
+    with db.pool.connection() as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert INDEXES <= names
+    assert 'idx_games_timestamp' not in names
+    # Solo in modalità ibrida (DatabaseManager.set_sync_index)
+    assert 'idx_games_unsynced' not in names
+    
+    # Una seconda esecuzione non ha nulla da applicare
+    assert MigrationRunner(db.pool, use_postgres=False).migrate() == []
+
+
+def test_game_history_sorted_by_index(db):
+    assert_uses_index(db, lambda db: db.get_game_history(10), 'idx_games_timestamp_id')
+
+
+def test_game_history_pages_sorted_by_index(db):
+    def two_pages(db):
+        _, next_cursor = db.get_game_history_page(page_size=2)
+        db.get_game_history_page(next_cursor, page_size=2)
+    
+    assert_uses_index(db, two_pages, 'idx_games_timestamp_id')
+
+
+def test_stats_by_type_filtered_by_index(db):
+    assert_uses_index(db, lambda db: db.get_stats_by_type('Nomi'), 'idx_games_category')
+
+
+def test_weekly_stats_grouped_by_week_index(db):
+    assert_uses_index(db, lambda db: db.get_weekly_stats(4), 'idx_games_week')
+
+
+def test_errors_by_type_read_from_aggregate_index(db):
+    assert_uses_index(db, lambda db: db.get_most_common_errors_by_type('Nomi', min_errors=1),
+                      'idx_word_error_stats_category')
+
+
+def test_confused_pairs_read_from_partial_index(db):
+    plans = query_plans(db, lambda db: db.get_most_confused_pairs())
+    assert plans
+    for sql, plan in plans:
+        assert any('COVERING INDEX idx_errors_confused' in detail for detail in plan), plan
+
+
+def test_unsynced_errors_looked_up_by_game(db):
+    db.set_sync_index()
+    plans = query_plans(db, lambda db: db.get_unsynced_games())
+    details = [' | '.join(plan) for _, plan in plans]
+    assert any('idx_games_unsynced' in detail for detail in details), details
+    assert any('SEARCH errors USING INDEX idx_errors_game_id' in detail for detail in details), details
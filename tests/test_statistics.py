@@ -0,0 +1,73 @@
+# ==================== tests/test_statistics.py ====================
+
+# Statistiche aggregate dal database su uno storico con settimane senza partite
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from benchmarks.statistics_equivalence import compare
+from src.database import DatabaseManager
+
+# Mercoledì pomeriggio: le partite di prova cadono a metà settimana
+REFERENCE = datetime(2024, 6, 12, 15, 30)
+
+# Settimane (prima di REFERENCE) con partite, separate da settimane vuote
+PLAYED_WEEKS = (0, 3, 10, 30, 52)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Storico sparso: due partite in ognuna delle settimane di PLAYED_WEEKS"""
+    db = DatabaseManager(db_path=str(tmp_path / 'games.db'))
+    for weeks_ago in PLAYED_WEEKS:
+        moment = REFERENCE - timedelta(weeks=weeks_ago)
+        db.save_game('Nomi', 'Traduzione', 10, 5, [], timestamp=moment)
+        db.save_game('Verbi', 'Traduzione', 10, 10, [], timestamp=moment + timedelta(days=1))
+    return db
+
+
+def monday(moment):
+    return (moment - timedelta(days=moment.weekday())).strftime('%Y-%m-%d')
+
+
+def test_weekly_stats_skip_weeks_without_games(db):
+    # Le ultime 4 settimane con partite, non le 4 settimane di calendario
+    expected = [monday(REFERENCE - timedelta(weeks=weeks_ago)) for weeks_ago in PLAYED_WEEKS[:4]]
+    
+    weekly = db.get_weekly_stats(4)
+    
+    assert [week for week, _, _ in weekly] == expected
+    assert all(games == 2 for _, games, _ in weekly)
+    assert all(avg == pytest.approx(75.0) for _, _, avg in weekly)
+
+
+def test_sql_stats_match_python_on_sparse_history(tmp_path):
+    # Settimane e giorni senza partite fino a oggi: settimane, date, streak e
+    # partite recenti devono coincidere con il calcolo in Python riga per riga
+    db = DatabaseManager(db_path=str(tmp_path / 'sparse.db'))
+    now = datetime.now().replace(microsecond=0)
+    for days_ago in (0, 1, 2, 5, 15, 16, 40, 41, 42, 150, 400):
+        for hour in (9, 20):
+            moment = now.replace(hour=hour, minute=0, second=0) - timedelta(days=days_ago)
+            db.save_game('Nomi', 'Traduzione', 20, days_ago % 20, [], timestamp=moment)
+    
+    mismatches, _, _ = compare(db)
+    
+    assert mismatches == []
+
+
+def test_generation_changes_on_commits_from_another_process(db):
+    # Una connessione separata sullo stesso file, come la CLI accanto a Streamlit
+    generation = db.generation
+    assert db.generation == generation
+    
+    with sqlite3.connect(db.db_path) as other:
+        other.execute("""
+            INSERT INTO games (timestamp, game_type, mode, total_questions,
+                               correct_answers, success_rate, uuid)
+            VALUES (0, 'Nomi', 'Traduzione', 10, 10, 100.0, 'other-process')
+        """)
+    other.close()
+    
+    assert db.generation != generation